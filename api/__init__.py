@@ -2,4 +2,4 @@ from flask import Blueprint
 
 api_blueprint = Blueprint('api', __name__)
 
-from . import scan, predict_create, predict_modify, detect_type
\ No newline at end of file
+from . import scan, predict_create, predict_modify, detect_type, metrics, health
\ No newline at end of file
@@ -0,0 +1,13 @@
+from . import api_blueprint
+from utils.warmup import get_warmup_state, is_ready
+from utils.response_util import success, error
+
+# 로드밸런서 헬스체크용: 모델 워밍업이 끝난 워커만 200 반환
+@api_blueprint.route("/api/ai/ready", methods=["GET"])
+def readiness():
+    state = get_warmup_state()
+    if is_ready():
+        return success("준비 완료", code=200, warmup=state)
+    if state["status"] == "failed":
+        return error(f"모델 워밍업 실패: {state['error']}", code=503)
+    return error("모델 워밍업 중입니다.", code=503)
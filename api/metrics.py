@@ -0,0 +1,23 @@
+from . import api_blueprint
+from utils.ocr_request import get_ocr_cache_stats, get_ocr_client_stats
+from utils.inference_scheduler import get_inference_scheduler_stats
+from utils.inference_executor import get_inference_executor_stats
+from utils.inference_cache import get_inference_cache_stats
+from utils.model_loader import get_model_cache_stats
+from utils.scanner import get_scan_encode_stats
+from utils.response_util import success
+
+# 캐시/성능 지표 조회용 엔드포인트
+@api_blueprint.route("/api/ai/metrics", methods=["GET"])
+def get_metrics():
+    return success(
+        message="지표 조회 성공",
+        code=200,
+        ocr_cache=get_ocr_cache_stats(),
+        ocr_client=get_ocr_client_stats(),
+        inference_batching=get_inference_scheduler_stats(),
+        inference_executor=get_inference_executor_stats(),
+        inference_cache=get_inference_cache_stats(),
+        model_cache=get_model_cache_stats(),
+        scan_encode=get_scan_encode_stats()
+    )
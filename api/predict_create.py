@@ -1,66 +1,41 @@
 from flask import request, jsonify
-import os, time
 from . import api_blueprint
-from utils.ocr_request import call_clova_ocr
-from utils.table_tokens import run_table_token_extraction
-from utils.text_tokens import run_text_token_extraction
-from utils.merge_tokens import run_merge_tokens
+from utils.ocr_request import call_clova_ocr, call_clova_ocr_pages, request_pages
 from utils.response_util import success, error
-from utils.layoutlm_inference import run_layoutlm_inference
-
-# 프로젝트 루트 경로 기준 설정
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR = os.path.join(BASE_DIR, 'data')
+from utils.inference_executor import InferenceOverloadedError
+from utils.pipeline import run_create_pipeline, run_create_pages_pipeline
 
 @api_blueprint.route("/api/ai/create", methods=["POST"])
 def predict_create():
     try:
         data = request.get_json()
 
+        # 여러 페이지: 한 번의 OCR 요청 → 페이지별 추출 병렬 실행 → 전체 페이지 한 배치로 추론
+        if "images" in data:
+            ocr_data = call_clova_ocr_pages(request_pages(data))
+            pages = run_create_pages_pipeline(ocr_data)
+            return success("분석 성공", code=200, filename="ocr_tokens.json", base64_str=None,
+                           result={"page_count": len(pages), "pages": pages})
+
         # base64 인코딩된 이미지와 확장자 받아오기
         base64_image = data.get("image_base64")
         file_ext = data.get("file_ext", "jpg").lower()
         
-        # 1. OCR 요청 및 결과 저장
-        ocr_filename = call_clova_ocr(base64_image, file_ext)
-        ocr_path = os.path.join(DATA_DIR, ocr_filename)
-
-        # OCR 결과 파일 생성될 때까지 기다림 (최대 5초)
-        for _ in range(10):
-            if os.path.exists(ocr_path):
-                break
-            time.sleep(0.5)
-        else:
-            raise FileNotFoundError(f"OCR 결과 파일이 생성되지 않았습니다: {ocr_path}")
-
-        # 2. 테이블 토큰 추출
-        run_table_token_extraction(
-            input_path=ocr_path,
-            output_path=os.path.join(DATA_DIR, 'ocr_tokens_from_table.json')
-        )
+        # 1. OCR 요청 (결과는 파일 저장 없이 바로 사용)
+        ocr_data = call_clova_ocr(base64_image, file_ext)
 
-        # 3. 텍스트 토큰 추출
-        run_text_token_extraction(
-            input_path=ocr_path,
-            output_path=os.path.join(DATA_DIR, 'ocr_tokens_from_text.json')
-        )
+        # 2. 테이블/텍스트 토큰 추출 → 병합 → LayoutLM 추론
+        result = run_create_pipeline(ocr_data)
 
-        # 4. 병합
-        tokens, bboxes = run_merge_tokens(
-            table_path=os.path.join(DATA_DIR, 'ocr_tokens_from_table.json'),
-            text_path=os.path.join(DATA_DIR, 'ocr_tokens_from_text.json'),
-            output_path=os.path.join(DATA_DIR, 'ocr_tokens.json')
-        )
-
-        # 5. LayoutLM 추론
-        result = run_layoutlm_inference(tokens, bboxes)
-
-        # 6. LayoutLM 추론 결과 반환
+        # 3. LayoutLM 추론 결과 반환
         return success("분석 성공", code=200, filename="ocr_tokens.json", base64_str=None, result=result)   
     
     except ValueError as ve:
         return error(str(ve), code=400)
 
+    except InferenceOverloadedError as oe:
+        return error(str(oe), code=503)
+
     except Exception as e:
         return error(str(e), code=500)
 
@@ -1,10 +1,21 @@
 import cv2
 import numpy as np
-from flask import request
+from flask import request, Response
 from api import api_blueprint
-from utils.scanner import scan_document
+from utils.scanner import scan_document, SCAN_FORMATS
 from utils.response_util import success, error
 
+def scan_param(name):
+    return request.form.get(name) or request.args.get(name)
+
+def response_format():
+    # format 파라미터가 없으면 Accept 헤더로 결정 (없거나 */*이면 기존처럼 base64 JSON)
+    fmt = scan_param('format')
+    if fmt:
+        return fmt.lower()
+    mimetype = request.accept_mimetypes.best_match(list(SCAN_FORMATS.values()), default=SCAN_FORMATS["json"])
+    return next(key for key, value in SCAN_FORMATS.items() if value == mimetype)
+
 @api_blueprint.route('/api/ai/scan', methods=['POST'])
 def scan_ai_document():
     file = request.files.get('file')
@@ -17,8 +28,21 @@ def scan_ai_document():
     if image is None:
         return error("이미지를 디코딩할 수 없습니다.", 400)
 
+    # 품질 단계: fast / balanced / best (없으면 SCAN_DEFAULT_QUALITY)
+    quality = scan_param('quality')
+    # 결과 형식: json(base64) / png / webp, 비트 수: 8 / 1 (흑백 PNG)
+    fmt = response_format()
+    bits = scan_param('bits') or "8"
+
     try:
-        base64_result = scan_document(image)
-        return success("스캔 완료", 200, filename=file.filename, base64_str=base64_result)
+        if not bits.isdigit():
+            raise ValueError(f"지원하지 않는 비트 수입니다: {bits} (1 또는 8)")
+        result = scan_document(image, quality=quality, fmt=fmt, bits=int(bits))
+        if fmt == "json":
+            return success("스캔 완료", 200, filename=file.filename, base64_str=result)
+        # 이미지 바이트를 그대로 응답 (base64 변환과 JSON 복사 없이)
+        return Response(result, status=200, mimetype=SCAN_FORMATS[fmt])
+    except ValueError as ve:
+        return error(str(ve), 400)
     except Exception as e:
         return error(str(e), 500)
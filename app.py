@@ -4,9 +4,13 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from flask import Flask
 from api import api_blueprint
+from utils.warmup import start_preload
 
 app = Flask(__name__)
 app.register_blueprint(api_blueprint)
 
+# EYEON_PRELOAD_DOCTYPES에 지정한 문서 유형 모델을 미리 로드/워밍업
+start_preload()
+
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5050)
\ No newline at end of file
@@ -0,0 +1,92 @@
+# 서브토큰 ↔ 단어 정렬 비용: 파이썬 루프(bbox 패딩 리스트 + seen_word_ids) vs 인덱스 배열 gather/첫 등장 마스크
+# 토크나이즈·모델 추론은 빼고, 토크나이저 출력과 예측 라벨 id 사이의 처리 시간만 문서당 ms로 비교
+# 사용법: python bench/bench_alignment.py [--doctype resume] [--repeat 20]
+import os
+import argparse
+import numpy as np
+import torch
+from transformers import LayoutLMTokenizerFast
+from bench_utils import synthetic_document, timeit
+from utils.model_loader import MODEL_DIR
+from utils.preprocessing import MAX_LENGTH, word_index_array, gather_bboxes
+from utils.layoutlm_inference import select_word_predictions
+
+def reference_glue(documents, encoding, sample_mapping, predictions):
+    # 이전 구현: 행마다 word_ids 리스트로 bbox 중첩 리스트를 만들고, 예측은 seen_word_ids 집합으로 첫 서브토큰만 선택
+    batch_word_ids, batch_bbox_padded = [], []
+    doc_bboxes = [doc.bbox_list() for doc in documents]
+    for row, doc_index in enumerate(sample_mapping):
+        bboxes = doc_bboxes[doc_index]
+        word_ids = encoding.word_ids(batch_index=row)
+        bbox_padded = []
+        for word_id in word_ids:
+            if word_id is not None and word_id < len(bboxes):
+                bbox_padded.append(bboxes[word_id])
+            else:
+                bbox_padded.append([0, 0, 0, 0])
+        batch_word_ids.append(word_ids)
+        batch_bbox_padded.append(bbox_padded)
+    bbox = torch.tensor(batch_bbox_padded, dtype=torch.int32)
+
+    predictions = predictions.tolist()
+    best = [{} for _ in documents]
+    for doc_index, word_ids, row_predictions in zip(sample_mapping, batch_word_ids, predictions):
+        positions = [i for i, word_id in enumerate(word_ids) if word_id is not None]
+        if not positions:
+            continue
+        first, last = positions[0], positions[-1]
+        seen_word_ids = set()
+        for i in positions:
+            word_id = word_ids[i]
+            if word_id in seen_word_ids:
+                continue
+            seen_word_ids.add(word_id)
+            context = min(i - first, last - i)
+            if word_id not in best[doc_index] or context > best[doc_index][word_id][0]:
+                best[doc_index][word_id] = (context, row_predictions[i])
+    labels = [[doc_best[w][1] for w in sorted(doc_best)] for doc_best in best]
+    return bbox, labels
+
+def vectorized_glue(documents, encoding, sample_mapping, predictions):
+    word_index = word_index_array(encoding, encoding["input_ids"].shape[1])
+    bbox = torch.from_numpy(gather_bboxes(documents, word_index, sample_mapping))
+    doc_indices, _, label_ids = select_word_predictions(word_index, predictions, sample_mapping)
+    bounds = np.searchsorted(doc_indices, np.arange(len(documents) + 1))
+    labels = [label_ids[bounds[i]:bounds[i + 1]].tolist() for i in range(len(documents))]
+    return bbox, labels
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doctype", default="resume")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tokenizer = LayoutLMTokenizerFast.from_pretrained(os.path.join(MODEL_DIR, args.doctype))
+    rng = np.random.default_rng(0)
+
+    print(f"{'words':>7}{'batch':>7}{'stride':>8}{'rows':>6}{'old ms/doc':>12}{'new ms/doc':>12}{'speedup':>9}  same")
+    for n_words, batch, stride in [(120, 1, None), (450, 1, None), (450, 8, None), (2000, 1, 128), (2000, 8, 128)]:
+        documents = [synthetic_document(args.doctype, n_words, seed=seed) for seed in range(batch)]
+        windowed = stride is not None
+        encoding = tokenizer(
+            [doc.tokens for doc in documents], is_split_into_words=True, padding="longest",
+            truncation=True, max_length=MAX_LENGTH, stride=stride or 0,
+            return_overflowing_tokens=windowed, return_tensors="pt",
+        )
+        if windowed:
+            sample_mapping = encoding.pop("overflow_to_sample_mapping").numpy().astype(np.intp)
+        else:
+            sample_mapping = np.arange(batch, dtype=np.intp)
+        predictions = rng.integers(0, 20, size=tuple(encoding["input_ids"].shape))
+
+        old = timeit(lambda: reference_glue(documents, encoding, sample_mapping, predictions), repeat=args.repeat)
+        new = timeit(lambda: vectorized_glue(documents, encoding, sample_mapping, predictions), repeat=args.repeat)
+        ref_bbox, ref_labels = reference_glue(documents, encoding, sample_mapping, predictions)
+        bbox, labels = vectorized_glue(documents, encoding, sample_mapping, predictions)
+        same = torch.equal(bbox, ref_bbox) and labels == ref_labels
+        speedup = old["p50_ms"] / new["p50_ms"] if new["p50_ms"] else float("nan")
+        print(f"{n_words:>7}{batch:>7}{str(stride):>8}{len(sample_mapping):>6}"
+              f"{old['p50_ms'] / batch:>12.3f}{new['p50_ms'] / batch:>12.3f}{speedup:>8.1f}x  {same}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# 토큰/bbox 표현: 리스트의 리스트 vs DocumentTokens(int32 (N, 4) 배열) 메모리·단계 사이 처리 시간
+# 처리 시간 = 병합·정렬 + 테이블 겹침 판정 + 추론 캐시 키 계산 (모델 추론 제외)
+# 사용법: python bench/bench_document_tokens.py [--repeat 20]
+import io
+import argparse
+import contextlib
+import json
+import hashlib
+import tracemalloc
+import numpy as np
+from bench_utils import synthetic_document, timeit
+from utils.common import cluster_lines
+from utils.document_tokens import DocumentTokens
+from utils.geometry import overlaps_any
+from utils.merge_tokens import run_merge_tokens
+
+TABLE_BOXES = np.array([[50, 100, 950, 400], [50, 600, 950, 800]], dtype=np.int64)
+
+def reference_glue(table_tokens, table_bboxes, text_tokens, text_bboxes):
+    # 이전 구현: 리스트 이어 붙이기 → 줄 묶기 → zip 정렬 → 리스트 bbox로 겹침 판정 → JSON 해시
+    tokens = table_tokens + text_tokens
+    bboxes = table_bboxes + text_bboxes
+    tokens_with_boxes = list(zip(tokens, bboxes))
+    norm_y_map, _ = cluster_lines(bboxes, tolerance=5)
+    tokens_with_boxes.sort(key=lambda x: (norm_y_map[x[1][1]], x[1][0]))
+    tokens, bboxes = map(list, zip(*tokens_with_boxes))
+    in_table = overlaps_any(bboxes, TABLE_BOXES)
+    digest = hashlib.sha256(json.dumps([tokens, bboxes], ensure_ascii=False).encode("utf-8")).hexdigest()
+    return tokens, bboxes, in_table, digest
+
+def document_glue(table_doc, text_doc):
+    doc = run_merge_tokens(table_doc, text_doc)
+    in_table = overlaps_any(doc.bboxes, TABLE_BOXES)
+    digest = hashlib.sha256()
+    digest.update(json.dumps(doc.tokens, ensure_ascii=False).encode("utf-8"))
+    digest.update(doc.bboxes.tobytes())
+    return doc, in_table, digest.hexdigest()
+
+def bbox_memory(build):
+    # 토큰 문자열은 두 방식이 공유하므로 bbox 구조만 측정
+    tracemalloc.start()
+    value = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return size
+
+def quiet(fn):
+    # run_merge_tokens의 완료 로그가 측정 출력을 덮지 않도록
+    def wrapped():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return wrapped
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'words':>7}{'list KB':>10}{'array KB':>10}{'old p50':>10}{'doc p50':>10}{'speedup':>9}  same")
+    for n_words in [100, 450, 1000, 3000, 10000]:
+        doc = synthetic_document("resume", n_words)
+        rows = doc.bbox_list()
+        split = len(doc) // 3
+        table_doc, text_doc = doc.take(np.arange(split)), doc.take(np.arange(split, len(doc)))
+        table_args = (table_doc.tokens, table_doc.bbox_list(), text_doc.tokens, text_doc.bbox_list())
+
+        list_kb = bbox_memory(lambda: [list(box) for box in rows]) / 1024
+        array_kb = bbox_memory(lambda: np.array(rows, dtype=np.int32)) / 1024
+
+        old = timeit(quiet(lambda: reference_glue(*table_args)), repeat=args.repeat, warmup=2)
+        new = timeit(quiet(lambda: document_glue(table_doc, text_doc)), repeat=args.repeat, warmup=2)
+
+        ref_tokens, ref_bboxes, ref_in_table, _ = quiet(lambda: reference_glue(*table_args))()
+        merged, in_table, _ = quiet(lambda: document_glue(table_doc, text_doc))()
+        same = merged == DocumentTokens(ref_tokens, ref_bboxes) and np.array_equal(in_table, ref_in_table)
+        speedup = old["p50_ms"] / new["p50_ms"] if new["p50_ms"] else float("nan")
+        print(f"{n_words:>7}{list_kb:>10.1f}{array_kb:>10.1f}{old['p50_ms']:>10}{new['p50_ms']:>10}{speedup:>8.1f}x  {same}")
+
+if __name__ == "__main__":
+    main()
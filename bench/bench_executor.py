@@ -0,0 +1,59 @@
+# 동시 요청 부하에서 추론 지연시간 분포와 거절 수 (현재 LAYOUTLM_EXECUTOR / LAYOUTLM_TORCH_THREADS 설정 기준)
+# 예: LAYOUTLM_EXECUTOR=thread LAYOUTLM_EXECUTOR_WORKERS=2 LAYOUTLM_TORCH_THREADS=4 python bench/bench_executor.py --clients 16
+import os
+import argparse
+import threading
+import time
+import numpy as np
+
+# 같은 문서를 반복해서 보내므로 추론 결과 캐시를 끔 (켜 두면 워밍업 이후 모든 요청이 캐시 적중)
+os.environ["LAYOUTLM_RESULT_CACHE_ENABLED"] = "0"
+
+from bench_utils import TYPICAL_WORD_COUNTS, synthetic_document
+from utils.layoutlm_inference import run_layoutlm_inference
+from utils.inference_executor import InferenceOverloadedError, get_inference_executor_stats
+
+def percentile(samples, q):
+    # bench_utils.timeit과 같은 공식 (선형 보간)
+    return round(float(np.percentile(samples, q * 100)) * 1000, 1) if samples else None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=10, help="클라이언트당 요청 수")
+    parser.add_argument("--doctype", default="resume")
+    args = parser.parse_args()
+
+    doc = synthetic_document(args.doctype, TYPICAL_WORD_COUNTS[args.doctype])
+    run_layoutlm_inference(doc)  # 모델 로드 + 워밍업
+
+    latencies, rejected = [], [0]
+    lock = threading.Lock()
+
+    def client():
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            try:
+                run_layoutlm_inference(doc)
+            except InferenceOverloadedError:
+                with lock:
+                    rejected[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"완료 {len(latencies)}건, 거절 {rejected[0]}건, 처리량 {len(latencies) / elapsed:.1f} req/s")
+    print(f"p50 {percentile(latencies, 0.5)}ms  p90 {percentile(latencies, 0.9)}ms  p99 {percentile(latencies, 0.99)}ms")
+    print(f"실행기: {get_inference_executor_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# bbox 정규화 + 테이블 포함/겹침 판정: 필드별 파이썬 루프 vs NumPy 벡터화(utils/geometry.py)
+# 사용법: python bench/bench_geometry.py [--repeat 20]
+import argparse
+from bench_utils import synthetic_ocr_page, timeit
+from utils.common import normalize_bbox
+from utils.geometry import PageGeometry
+
+def loop_geometry(ocr_data):
+    # 기존 단계별 구현과 같은 방식: 필드마다 정규화하고 모든 테이블과 하나씩 비교
+    image = ocr_data["images"][0]
+    w, h = image["convertedImageInfo"]["width"], image["convertedImageInfo"]["height"]
+    tables = [normalize_bbox(t["boundingPoly"]["vertices"], w, h) for t in image["tables"]]
+    boxes = [normalize_bbox(f["boundingPoly"]["vertices"], w, h) for f in image["fields"]]
+    inside = [any(b[0] >= t[0] and b[1] >= t[1] and b[2] <= t[2] and b[3] <= t[3] for t in tables) for b in boxes]
+    overlap = [any(not (b[2] < t[0] or b[0] > t[2] or b[3] < t[1] or b[1] > t[3]) for t in tables) for b in boxes]
+    return boxes, inside, overlap
+
+def vectorized_geometry(ocr_data):
+    geometry = PageGeometry.from_ocr(ocr_data)
+    return (
+        geometry.field_boxes.tolist(),
+        geometry.fields_inside_tables().tolist(),
+        geometry.overlaps_tables(geometry.field_boxes).tolist(),
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'fields':>7}{'tables':>7}{'loop p50':>11}{'numpy p50':>11}{'speedup':>9}  same")
+    for n_fields, n_tables in [(100, 2), (500, 5), (1000, 10), (2000, 20), (4000, 40)]:
+        page = synthetic_ocr_page(n_fields, n_tables)
+        loop = timeit(lambda: loop_geometry(page), repeat=args.repeat)
+        vectorized = timeit(lambda: vectorized_geometry(page), repeat=args.repeat)
+        same = loop_geometry(page) == vectorized_geometry(page)
+        speedup = loop["p50_ms"] / vectorized["p50_ms"] if vectorized["p50_ms"] else float("nan")
+        print(f"{n_fields:>7}{n_tables:>7}{loop['p50_ms']:>11}{vectorized['p50_ms']:>11}{speedup:>8.1f}x  {same}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# 줄 묶기: 기존 방식(모든 줄 기준 y와 비교, O(n·줄 수)) vs 정렬 후 한 번 훑기(O(n log n))
+# 사용법: python bench/bench_line_clustering.py [--repeat 10]
+import argparse
+import random
+from bench_utils import timeit
+from utils.common import cluster_lines
+
+def reference_group_lines_by_y(bboxes, tolerance=5):
+    # 이전 구현 (입력 순서에 따라 결과가 달라짐)
+    y_groups = []
+    norm_y_map = {}
+    for box in bboxes:
+        y = box[1]
+        found = False
+        for ref_y in y_groups:
+            if abs(ref_y - y) <= tolerance:
+                norm_y_map[y] = ref_y
+                found = True
+                break
+        if not found:
+            y_groups.append(y)
+            norm_y_map[y] = y
+    return norm_y_map
+
+def dense_page(n_boxes, seed=0, page_height=20000):
+    # 줄 간격 ~22, 줄 안에서 y1이 0~4 흔들리는 빽빽한 페이지 (긴 문서를 이어 붙인 높이)
+    rng = random.Random(seed)
+    n_lines = max(1, page_height // 22)
+    boxes = []
+    for _ in range(n_boxes):
+        y = rng.randrange(n_lines) * 22 + rng.randint(0, 4)
+        x = rng.randint(0, 900)
+        boxes.append([x, y, x + 50, y + 18])
+    rng.shuffle(boxes)
+    return boxes
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'boxes':>7}{'lines':>7}{'old p50':>11}{'sorted p50':>12}{'speedup':>9}  same(y 정렬 입력)")
+    for n_boxes in [500, 1000, 2000, 4000, 8000]:
+        boxes = dense_page(n_boxes, page_height=n_boxes * 5)
+        old = timeit(lambda: reference_group_lines_by_y(boxes), repeat=args.repeat, warmup=1)
+        new = timeit(lambda: cluster_lines(boxes), repeat=args.repeat, warmup=1)
+        sorted_boxes = sorted(boxes, key=lambda box: box[1])
+        same = reference_group_lines_by_y(sorted_boxes) == cluster_lines(sorted_boxes)[0]
+        n_lines = len(cluster_lines(boxes)[1])
+        speedup = old["p50_ms"] / new["p50_ms"] if new["p50_ms"] else float("nan")
+        print(f"{n_boxes:>7}{n_lines:>7}{old['p50_ms']:>11}{new['p50_ms']:>12}{speedup:>8.1f}x  {same}")
+
+if __name__ == "__main__":
+    main()
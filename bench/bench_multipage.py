@@ -0,0 +1,79 @@
+# 여러 페이지 문서: 페이지마다 따로 요청(OCR 왕복 + 추출 + 추론 N번) vs 한 요청(OCR 1번 + 페이지 병렬 추출 + 한 배치 추론)
+# OCR 왕복 시간은 --ocr-ms로 흉내냄 (실제 Clova 호출 없음), 추론 결과 캐시는 매번 비움
+# 사용법: python bench/bench_multipage.py [--pages 1 2 4 8] [--ocr-ms 800] [--repeat 5]
+import io
+import time
+import random
+import argparse
+import contextlib
+from bench_utils import synthetic_ocr_page, timeit, _poly, _vocabulary
+from utils.inference_cache import inference_cache
+from utils.pipeline import run_create_pipeline, run_create_pages_pipeline, PAGE_WORKERS
+
+def document_page(seed, title=None, n_fields=250, n_tables=2, width=2480, height=3508):
+    # 줄 단위로 겹치지 않게 배치한 페이지 (synthetic_ocr_page는 필드가 무작위로 겹쳐 빈칸 bbox 폭이 음수가 될 수 있고,
+    # 왼쪽 여백이 좁으면 "년"/"월"/"일" 앞 빈칸이 0보다 왼쪽으로 나감)
+    rng = random.Random(seed)
+    page = synthetic_ocr_page(n_fields=0, n_tables=n_tables, seed=seed, width=width, height=height)["images"][0]
+    vocab = [word for word in _vocabulary() if word not in {":", "(인)"}]
+    fields = [{"inferText": title, "boundingPoly": _poly(1000, 60, 1400, 140)}] if title else []
+    x, y = 300, 200
+    for _ in range(n_fields):
+        w = rng.randint(120, 300)
+        if x + w > width - 100:
+            x, y = 300, y + 60
+        if y + 40 > height:
+            break
+        fields.append({"inferText": rng.choice(vocab), "boundingPoly": _poly(x, y, x + w, y + 40)})
+        x += w + rng.randint(20, 80)
+    page["fields"] = fields
+    return page
+
+def document_pages(n_pages):
+    # 첫 페이지에만 제목(이력서)이 있는 N페이지 문서
+    return {"images": [document_page(idx, "이력서" if idx == 0 else None) for idx in range(n_pages)]}
+
+def per_page_requests(ocr_data, ocr_seconds):
+    # 클라이언트가 페이지를 나눠 순서대로 보내던 방식 (2페이지부터는 제목이 없어 첫 페이지 문서 유형을 알 수 없으므로
+    # 같은 조건을 맞추기 위해 제목 필드를 붙여서 보낸다고 가정)
+    title = ocr_data["images"][0]["fields"][0]
+    results = []
+    for idx, image in enumerate(ocr_data["images"]):
+        time.sleep(ocr_seconds)
+        page = dict(image, fields=([title] if idx else []) + image["fields"])
+        results.append(run_create_pipeline({"images": [page]}))
+    return results
+
+def one_request(ocr_data, ocr_seconds):
+    time.sleep(ocr_seconds)
+    return run_create_pages_pipeline(ocr_data)
+
+def quiet(fn):
+    def wrapped():
+        if inference_cache:
+            inference_cache.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return wrapped
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ocr-ms", type=float, default=800)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    ocr_seconds = args.ocr_ms / 1000
+
+    quiet(lambda: one_request(document_pages(1), 0))()  # 모델 로드 + 워밍업
+    print(f"PIPELINE_PAGE_WORKERS={PAGE_WORKERS}, 가상 OCR 왕복 {args.ocr_ms:.0f}ms")
+    print(f"{'pages':>6}{'per-page p50':>14}{'one-req p50':>13}{'no-OCR per-page':>17}{'no-OCR one-req':>16}")
+    for n_pages in args.pages:
+        ocr_data = document_pages(n_pages)
+        split = timeit(quiet(lambda: per_page_requests(ocr_data, ocr_seconds)), repeat=args.repeat, warmup=1)
+        joined = timeit(quiet(lambda: one_request(ocr_data, ocr_seconds)), repeat=args.repeat, warmup=1)
+        split_cpu = timeit(quiet(lambda: per_page_requests(ocr_data, 0)), repeat=args.repeat, warmup=1)
+        joined_cpu = timeit(quiet(lambda: one_request(ocr_data, 0)), repeat=args.repeat, warmup=1)
+        print(f"{n_pages:>6}{split['p50_ms']:>14}{joined['p50_ms']:>13}{split_cpu['p50_ms']:>17}{joined_cpu['p50_ms']:>16}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# 문서 유형별 LayoutLM 추론 지연시간: 512 고정 패딩 vs 버킷 동적 패딩
+# 사용법: python bench/bench_padding.py [--repeat 20] [--doctypes resume,certificate]
+import argparse
+import torch
+from bench_utils import TYPICAL_WORD_COUNTS, synthetic_document, timeit
+from utils.model_loader import get_model_and_tokenizer
+from utils.preprocessing import preprocess_batch, PAD_BUCKETS, MAX_LENGTH
+
+def forward(model, tokenizer, doc, buckets):
+    encoding, _, _ = preprocess_batch([doc], tokenizer, buckets=buckets)
+    with torch.no_grad():
+        inputs = {k: v for k, v in encoding.items() if k != "offset_mapping"}
+        model(**inputs)
+    return encoding["input_ids"].shape[1]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--doctypes", default=",".join(TYPICAL_WORD_COUNTS))
+    args = parser.parse_args()
+
+    print(f"{'doctype':<12}{'words':>6}{'len':>6}{'fixed p50':>11}{'bucket p50':>12}{'speedup':>9}")
+    for doctype in args.doctypes.split(","):
+        (model, tokenizer), _ = get_model_and_tokenizer(doctype)
+        doc = synthetic_document(doctype, TYPICAL_WORD_COUNTS[doctype])
+
+        fixed = timeit(lambda: forward(model, tokenizer, doc, (MAX_LENGTH,)), repeat=args.repeat)
+        bucketed = timeit(lambda: forward(model, tokenizer, doc, PAD_BUCKETS), repeat=args.repeat)
+        padded_len = forward(model, tokenizer, doc, PAD_BUCKETS)
+
+        speedup = fixed["p50_ms"] / bucketed["p50_ms"] if bucketed["p50_ms"] else float("nan")
+        print(f"{doctype:<12}{len(doc):>6}{padded_len:>6}{fixed['p50_ms']:>11}{bucketed['p50_ms']:>12}{speedup:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
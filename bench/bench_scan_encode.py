@@ -0,0 +1,48 @@
+# 스캔 결과 응답 형식별 본문 크기와 인코딩 시간: base64 JSON(기존) vs PNG/WebP 바이트, PNG 압축 단계, 1비트 흑백 PNG
+# json 행은 PNG 인코딩 + base64 + JSON 직렬화까지 포함 (응답 본문 전체)
+# 사용법: python bench/bench_scan_encode.py [--levels -1 1 3 6 9] [--fixtures 3] [--repeat 5]
+import io
+import json
+import argparse
+import contextlib
+import numpy as np
+from bench_utils import synthetic_photo, timeit
+from utils import scanner
+from utils.scanner import scan_page, encode_scan_result
+
+RESOLUTIONS = [(2592, 1944), (4000, 3000)]  # 5MP, 12MP
+
+def response_body(page, fmt, bits):
+    body = encode_scan_result(page, fmt, bits)
+    if fmt == "json":
+        body = json.dumps({"isSuccess": True, "httpStatus": 200, "message": "스캔 완료", "filename": "scan.jpg", "base64": body})
+    return body
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=int, nargs="+", default=[-1, 1, 3, 6, 9], help="SCAN_PNG_COMPRESSION 값 (-1 = OpenCV 기본값)")
+    parser.add_argument("--fixtures", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [("json", 8, level) for level in args.levels] + [("png", 8, level) for level in args.levels]
+    cases += [("png", 1, level) for level in args.levels] + [("webp", 8, None)]
+    print(f"SCAN_WEBP_QUALITY={scanner.WEBP_QUALITY}, 크기/시간 = 스캔 결과 {args.fixtures}장 평균 / p50 중앙값")
+    print(f"{'page':>11}{'format':>8}{'bits':>6}{'png lvl':>9}{'body KB':>10}{'encode ms':>11}")
+    for size in RESOLUTIONS:
+        pages = []
+        for seed in range(args.fixtures):
+            photo, _ = synthetic_photo(size, seed=seed, noise=5.0)
+            with contextlib.redirect_stdout(io.StringIO()):
+                pages.append(scan_page(photo, quality="fast"))
+        page_size = f"{pages[0].shape[1]}x{pages[0].shape[0]}"
+        for fmt, bits, level in cases:
+            if level is not None:
+                scanner.PNG_COMPRESSION = level
+            sizes = [len(response_body(page, fmt, bits)) for page in pages]
+            timings = [timeit(lambda: response_body(page, fmt, bits), repeat=args.repeat, warmup=1)["p50_ms"] for page in pages]
+            level_label = "-" if level is None else ("기본" if level < 0 else str(level))
+            print(f"{page_size:>11}{fmt:>8}{bits:>6}{level_label:>9}{np.mean(sizes) / 1024:>10.1f}{np.median(timings):>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# 스캔 품질 단계(fast / balanced / best)별 보정 지연시간 + 간단한 OCR 준비도
+# 가짜 촬영 사진(센서 노이즈 포함)을 원근 보정한 뒤 단계별 enhance_image 결과를 원본 문서의 글자 픽셀과 비교
+# OCR 준비도: 글자 픽셀 F1 (1px 허용 오차) — precision이 낮으면 배경 얼룩, recall이 낮으면 끊긴 획
+# 사용법: python bench/bench_scan_quality.py [--noise 10] [--fixtures 3] [--repeat 3]
+import argparse
+import cv2
+import numpy as np
+from bench_utils import synthetic_page, synthetic_photo, timeit
+from utils.scanner import SCAN_QUALITIES, find_document_corners, apply_perspective_transform, denoise, enhance_image
+
+RESOLUTIONS = [(2592, 1944), (3264, 2448), (4000, 3000)]  # 5MP, 8MP, 12MP
+
+def text_mask(image):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    return gray < 128
+
+def ocr_readiness(enhanced, page):
+    # 보정 결과를 원본 문서 크기로 맞춰 글자 픽셀 비교 (꼭짓점 검출 오차를 감안해 1px 팽창한 쪽과 대조)
+    truth = text_mask(page)
+    found = text_mask(cv2.resize(enhanced, (page.shape[1], page.shape[0]), interpolation=cv2.INTER_AREA))
+    kernel = np.ones((3, 3), np.uint8)
+    truth_near = cv2.dilate(truth.astype(np.uint8), kernel).astype(bool)
+    found_near = cv2.dilate(found.astype(np.uint8), kernel).astype(bool)
+    precision = (found & truth_near).sum() / max(1, found.sum())
+    recall = (truth & found_near).sum() / max(1, truth.sum())
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--noise", type=float, default=10.0, help="촬영 사진에 더할 센서 노이즈 표준편차")
+    parser.add_argument("--fixtures", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"센서 노이즈 σ={args.noise}, 시간 = 원근 보정된 문서 한 장 기준 p50")
+    print(f"{'photo':>11}{'page':>11}{'quality':>10}{'denoise ms':>12}{'enhance ms':>12}{'precision':>11}{'recall':>8}{'F1':>7}")
+    for size in RESOLUTIONS:
+        rows = {quality: [] for quality in SCAN_QUALITIES}
+        for seed in range(args.fixtures):
+            photo, _ = synthetic_photo(size, seed=seed, noise=args.noise)
+            warped = apply_perspective_transform(photo, find_document_corners(photo))
+            gray = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
+            page = synthetic_page(seed=seed)
+            for quality in SCAN_QUALITIES:
+                enhanced = enhance_image(warped, quality)
+                if seed == 0:
+                    denoise_ms = timeit(lambda: denoise(gray, quality), repeat=args.repeat, warmup=1)["p50_ms"]
+                    enhance_ms = timeit(lambda: enhance_image(warped, quality), repeat=args.repeat, warmup=0)["p50_ms"]
+                    rows[quality].append((denoise_ms, enhance_ms))
+                rows[quality].append(ocr_readiness(enhanced, page))
+        page_size = f"{warped.shape[1]}x{warped.shape[0]}"
+        for quality in SCAN_QUALITIES:
+            (denoise_ms, enhance_ms), *scores = rows[quality]
+            precision, recall, f1 = np.mean(scores, axis=0)
+            print(f"{size[0]:>5}x{size[1]:<5}{page_size:>11}{quality:>10}{denoise_ms:>12.1f}{enhance_ms:>12.1f}"
+                  f"{precision:>11.3f}{recall:>8.3f}{f1:>7.3f}")
+
+if __name__ == "__main__":
+    main()
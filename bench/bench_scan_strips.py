@@ -0,0 +1,34 @@
+# 스캔 보정(enhance_image) 순차 처리 vs 가로 띠 병렬 처리: 워커 수별 지연시간과 순차 결과와 다른 픽셀 수
+# 띠 병렬은 쓸 수 있는 코어 수만큼만 빨라짐 (스레드 풀은 USABLE_CPUS로 제한되므로 그보다 큰 워커 수는 띠만 늘어남)
+# 사용법: python bench/bench_scan_strips.py [--workers 1 2 4 8] [--quality fast balanced best] [--repeat 3]
+import os
+import argparse
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+parser.add_argument("--quality", nargs="+", default=["fast", "balanced", "best"])
+parser.add_argument("--size", type=int, nargs=2, default=[3264, 2448], help="촬영 사진 크기 (가로 세로)")
+parser.add_argument("--repeat", type=int, default=3)
+args = parser.parse_args()
+# 띠 스레드 풀 크기는 모듈 로드 시점에 정해지므로 import 전에 가장 큰 워커 수로 맞춤
+os.environ["SCAN_ENHANCE_WORKERS"] = str(max(args.workers))
+
+from bench_utils import synthetic_photo, timeit
+from utils.scanner import USABLE_CPUS, ENHANCE_WORKERS, find_document_corners, apply_perspective_transform, enhance_image
+
+def main():
+    photo, _ = synthetic_photo(tuple(args.size), seed=0, noise=10.0)
+    warped = apply_perspective_transform(photo, find_document_corners(photo))
+    print(f"사용 가능한 CPU {USABLE_CPUS}개 (os.cpu_count() {os.cpu_count()}), 띠 스레드 풀 {ENHANCE_WORKERS}개, 원근 보정된 문서 {warped.shape[1]}x{warped.shape[0]}")
+    print(f"{'quality':>9}{'workers':>9}{'p50 ms':>10}{'speedup':>9}{'diff px':>9}")
+    for quality in args.quality:
+        sequential = enhance_image(warped, quality, workers=1)
+        base_ms = None
+        for workers in args.workers:
+            diff = int((enhance_image(warped, quality, workers=workers) != sequential).sum())
+            p50 = timeit(lambda: enhance_image(warped, quality, workers=workers), repeat=args.repeat, warmup=0)["p50_ms"]
+            base_ms = base_ms or p50
+            print(f"{quality:>9}{workers:>9}{p50:>10.1f}{base_ms / p50:>8.2f}x{diff:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import time
+import random
+import cv2
+import numpy as np
+
+# bench 스크립트를 프로젝트 루트 기준으로 실행할 수 있도록 경로 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from utils.common import LABEL_KEYWORDS_PATH
+from utils.document_tokens import DocumentTokens
+
+# 문서 유형별 대표 단어 수 (실제 양식 기준 대략치)
+TYPICAL_WORD_COUNTS = {
+    "certificate": 80,
+    "consent": 120,
+    "self_intro": 260,
+    "report": 320,
+    "resume": 450,
+}
+
+TITLES = {
+    "resume": "이력서",
+    "certificate": "재직증명서",
+    "consent": "위임장",
+    "self_intro": "자기소개서",
+    "report": "일일업무보고서",
+}
+
+def _vocabulary():
+    with open(LABEL_KEYWORDS_PATH, "r", encoding="utf-8") as f:
+        label_keywords = json.load(f)
+    words = set()
+    for section in label_keywords.values():
+        for group in section.values():
+            words.update(group.keys())
+    words.update([":", "(인)", "[BLANK]", "년", "월", "일", "2024", "12", "31", "홍길동", "서울특별시"])
+    return sorted(words)
+
+def synthetic_document(doctype, n_words, seed=0):
+    # 제목 + 라벨 키워드/값으로 이루어진 줄 단위 가짜 문서 (DocumentTokens, 0~1000 정규화 bbox)
+    rng = random.Random(seed)
+    vocab = _vocabulary()
+    tokens = [TITLES[doctype]]
+    bboxes = [[400, 40, 600, 70]]
+    x, y = 60, 100
+    for _ in range(n_words - 1):
+        word = rng.choice(vocab)
+        w = min(200, 20 + 15 * len(word))
+        if x + w > 960:
+            x, y = 60, y + 22
+        tokens.append(word)
+        bboxes.append([x, min(y, 980), x + w, min(y + 18, 1000)])
+        x += w + 10
+    return DocumentTokens(tokens, bboxes)
+
+def timeit(fn, repeat=20, warmup=3):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    # 두 백분위수 모두 같은 선형 보간 공식으로 계산 (표본이 적어도 p50 <= p90)
+    p50, p90 = np.percentile(samples, [50, 90]) * 1000
+    return {"p50_ms": round(float(p50), 2), "p90_ms": round(float(p90), 2)}
+
+def _poly(x0, y0, x1, y1):
+    return {"vertices": [{"x": x0, "y": y0}, {"x": x1, "y": y0}, {"x": x1, "y": y1}, {"x": x0, "y": y1}]}
+
+def synthetic_ocr_page(n_fields, n_tables, seed=0, width=2480, height=3508):
+    # CLOVA OCR 응답 형태의 가짜 페이지 (픽셀 좌표, 필드 일부는 테이블 안에 위치)
+    rng = random.Random(seed)
+    vocab = _vocabulary()
+    tables = []
+    for _ in range(n_tables):
+        x0, y0 = rng.uniform(0, width * 0.7), rng.uniform(0, height * 0.9)
+        x1, y1 = x0 + rng.uniform(200, width * 0.3), y0 + rng.uniform(60, 300)
+        cell = {"boundingPoly": _poly(x0, y0, x1, y1), "cellTextLines": [{"cellWords": [{"inferText": rng.choice(vocab)}]}]}
+        tables.append({"boundingPoly": _poly(x0, y0, x1, y1), "cells": [cell]})
+    fields = []
+    for _ in range(n_fields):
+        x0, y0 = rng.uniform(0, width - 200), rng.uniform(0, height - 40)
+        fields.append({"inferText": rng.choice(vocab), "boundingPoly": _poly(x0, y0, x0 + rng.uniform(20, 200), y0 + rng.uniform(15, 40))})
+    return {"images": [{"convertedImageInfo": {"width": width, "height": height}, "fields": fields, "tables": tables}]}
+
+# --- 스캐너용 가짜 촬영 사진 ---
+def synthetic_page(page_w=1240, page_h=1754, seed=0, skew=0.0):
+    # 글자 줄과 표 테두리가 있는 A4 비율 흰 문서
+    # skew: 내용이 비뚤게 인쇄된 각도(도, 반시계 방향 +), 종이 테두리는 그대로
+    rng = random.Random(seed)
+    page = np.full((page_h, page_w, 3), 250, dtype=np.uint8)
+    y = 120
+    while y < page_h - 120:
+        if rng.random() < 0.15:
+            cv2.rectangle(page, (100, y), (page_w - 100, y + 160), (30, 30, 30), 3)
+            y += 200
+            continue
+        x = 100
+        while x < page_w - 200:
+            w = rng.randint(40, 200)
+            word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(w // 20))
+            cv2.putText(page, word, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (20, 20, 20), 2)
+            x += w + rng.randint(10, 40)
+        y += rng.randint(45, 70)
+    if skew:
+        M = cv2.getRotationMatrix2D((page_w / 2, page_h / 2), skew, 1.0)
+        page = cv2.warpAffine(page, M, (page_w, page_h), flags=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=(250, 250, 250))
+    return page
+
+def synthetic_photo(size, seed=0, noise=0.0, skew=0.0):
+    # 밝은 책상 위 문서 사진: 문서 아래 부드러운 그림자 + 노이즈, 문서는 임의 원근으로 배치, 정답 꼭짓점(tl, tr, br, bl) 반환
+    # noise: 사진 전체에 더할 센서 노이즈 표준편차 (0이면 책상 질감 노이즈만), skew: synthetic_page의 내용 기울기
+    # (배경이 어두우면 흰 패딩과의 경계가 가장 큰 사각형이 되어 기존 검출도 사진 전체를 문서로 잡으므로 밝은 배경 사용)
+    rng = np.random.default_rng(seed)
+    w, h = size
+    gradient = np.linspace(-6, 6, w, dtype=np.float32)[None, :] + np.linspace(-4, 4, h, dtype=np.float32)[:, None]
+    desk = 232 + gradient + rng.normal(0, 2, (h, w)).astype(np.float32)
+
+    page = synthetic_page(seed=seed, skew=skew)
+    ph, pw = page.shape[:2]
+    # 문서가 사진 높이의 55~80%를 차지하고 꼭짓점이 ±6% 흔들리는 원근
+    cx, cy = w / 2 + rng.uniform(-0.05, 0.05) * w, h / 2 + rng.uniform(-0.05, 0.05) * h
+    half_h = h * rng.uniform(0.28, 0.40)
+    half_w = half_h * pw / ph
+    jitter = lambda: rng.uniform(-0.06, 0.06) * min(w, h)
+    corners = np.array([
+        [cx - half_w + jitter(), cy - half_h + jitter()],
+        [cx + half_w + jitter(), cy - half_h + jitter()],
+        [cx + half_w + jitter(), cy + half_h + jitter()],
+        [cx - half_w + jitter(), cy + half_h + jitter()],
+    ], dtype=np.float32)
+    src = np.array([[0, 0], [pw - 1, 0], [pw - 1, ph - 1], [0, ph - 1]], dtype=np.float32)
+    M = cv2.getPerspectiveTransform(src, corners)
+    warped_page = cv2.warpPerspective(page, M, (w, h), flags=cv2.INTER_LINEAR)
+    mask = cv2.warpPerspective(np.full((ph, pw), 255, dtype=np.uint8), M, (w, h), flags=cv2.INTER_LINEAR)
+    alpha = (mask.astype(np.float32) / 255)[..., None]
+
+    # 바깥쪽으로 서서히 옅어지는 그림자 (문서 가장자리만 뚜렷한 경계가 되도록)
+    sigma = 0.012 * min(w, h)
+    shadow = cv2.GaussianBlur(mask.astype(np.float32) / 255, (0, 0), sigma)
+    desk = desk * (1 - 0.45 * shadow)
+    background = np.repeat(desk[..., None], 3, axis=2)
+    photo = warped_page * alpha + background * (1 - alpha)
+    if noise:
+        photo = photo + rng.normal(0, noise, photo.shape).astype(np.float32)
+    return np.clip(photo, 0, 255).astype(np.uint8), corners
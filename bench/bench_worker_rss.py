@@ -0,0 +1,105 @@
+# 워커 수별 프로세스 메모리: 가중치 로드 방식 copy / mmap / fork(부모에서 로드 + gc.freeze 후 fork, gunicorn --preload와 같은 구조)
+# 워커 N개를 동시에 띄워 모델을 로드·추론한 뒤 /proc/<pid>/smaps_rollup을 비교
+# (Pss: 공유 페이지를 나눠 가진 실제 부담, Pss_File: 파일 매핑(가중치 파일·라이브러리), Pss_Anon: 익명 메모리(복사된 가중치·힙))
+# none은 모델 없이 import만 한 워커 → "model"은 같은 N의 none 대비 워커당 늘어난 Pss (가중치가 실제로 드는 몫)
+# "total"은 N개 워커(+ fork의 부모) Pss 합, 즉 호스트가 실제로 쓰는 메모리
+# 가중치 파일은 디스크(ext4 등)에 있어야 함 (tmpfs면 파일 페이지가 곧 공유 메모리라 copy와 mmap의 차이가 흐려짐)
+# 사용법: python bench/bench_worker_rss.py --model-dir /data/model [--workers 1 2 4] [--modes none,copy,mmap,fork] [--doctypes resume]
+import argparse
+import multiprocessing
+import os
+from bench_utils import TYPICAL_WORD_COUNTS, synthetic_document
+from utils.model_loader import MODEL_DIR
+
+FIELDS = ("Rss", "Pss", "Pss_Anon", "Pss_File")
+
+def read_smaps_rollup(pid="self"):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].rstrip(":") in FIELDS:
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024  # kB → MB
+    return values
+
+def run_models(doctypes, model_dir):
+    # 요청 처리와 같이 모델을 로드하고 forward pass 한 번 (가중치 페이지를 실제로 건드림)
+    import torch
+    from utils.model_loader import get_model_and_tokenizer
+    from utils.preprocessing import preprocess_batch
+    for doctype in doctypes:
+        (model, tokenizer), _ = get_model_and_tokenizer(doctype, base_path=model_dir)
+        encoding, _, _ = preprocess_batch([synthetic_document(doctype, TYPICAL_WORD_COUNTS[doctype])], tokenizer)
+        with torch.no_grad():
+            model(**{k: v for k, v in encoding.items() if k != "offset_mapping"})
+
+def worker(mode, doctypes, model_dir, loaded, release, results):
+    if mode != "none":
+        run_models(doctypes, model_dir)
+    loaded.wait()   # 모든 워커가 모델을 들고 있는 상태에서 측정해야 Pss가 의미 있음
+    results.put(read_smaps_rollup())
+    release.wait()
+
+def start_workers(ctx, mode, doctypes, model_dir, workers, results):
+    loaded, release = ctx.Barrier(workers), ctx.Barrier(workers + 1)
+    procs = [ctx.Process(target=worker, args=(mode, doctypes, model_dir, loaded, release, results)) for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    samples = [results.get() for _ in procs]
+    release.wait()
+    for proc in procs:
+        proc.join()
+    return samples
+
+def preload_master(doctypes, model_dir, workers, done):
+    # gunicorn --preload + EYEON_PRELOAD_BLOCKING=1과 같은 순서: 로드·워밍업 → gc.freeze() → fork
+    import gc
+    run_models(doctypes, model_dir)
+    gc.freeze()
+    ctx = multiprocessing.get_context("fork")
+    samples = start_workers(ctx, "fork", doctypes, model_dir, workers, ctx.Queue())
+    done.put((samples, read_smaps_rollup()))
+
+def measure(mode, doctypes, model_dir, workers):
+    # 워커는 spawn으로 시작하므로 import 전에 설정하면 새 인터프리터의 설정으로 반영됨
+    os.environ["MODEL_LOAD_MODE"] = "mmap" if mode == "mmap" else "copy"
+    ctx = multiprocessing.get_context("spawn")
+    if mode == "fork":
+        done = ctx.Queue()
+        master = ctx.Process(target=preload_master, args=(doctypes, model_dir, workers, done))
+        master.start()
+        samples, parent = done.get()
+        master.join()
+    else:
+        samples, parent = start_workers(ctx, mode, doctypes, model_dir, workers, ctx.Queue()), None
+    avg = {field: sum(s.get(field, 0) for s in samples) / len(samples) for field in FIELDS}
+    avg["total"] = sum(s["Pss"] for s in samples) + (parent["Pss"] if parent else 0)
+    return avg
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--modes", default="none,copy,mmap,fork")
+    parser.add_argument("--doctypes", default=None, help="기본: model-dir에 있는 문서 유형 전체")
+    args = parser.parse_args()
+    doctypes = args.doctypes.split(",") if args.doctypes else [
+        doctype for doctype in TYPICAL_WORD_COUNTS
+        if os.path.exists(os.path.join(args.model_dir, doctype, "model.safetensors"))
+    ]
+    weights_mb = sum(os.path.getsize(os.path.join(args.model_dir, doctype, "model.safetensors")) for doctype in doctypes) / 2**20
+
+    print(f"문서 유형 {','.join(doctypes)}, 가중치 파일 {weights_mb:.0f}MB ({args.model_dir}), 워커당 평균 MB")
+    print(f"{'mode':<6}{'N':>3}" + "".join(f"{field:>10}" for field in FIELDS) + f"{'model':>10}{'total':>10}")
+    for n_workers in args.workers:
+        baseline = None
+        for mode in args.modes.split(","):
+            avg = measure(mode, doctypes, args.model_dir, n_workers)
+            if mode == "none":
+                baseline = avg["Pss"]
+            model = f"{avg['Pss'] - baseline:>10.1f}" if baseline is not None else f"{'-':>10}"
+            row = "".join(f"{avg[field]:>10.1f}" for field in FIELDS)
+            print(f"{mode:<6}{n_workers:>3}{row}{model}{avg['total']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# 빈칸 규칙 엔진(utils/blank_rules.py)이 이전 구현과 같은 결과를 내는지 확인
+# 1) 규칙 관련 토큰(":", "(인)", "[BLANK]", 년/월/일, 숫자)이 많은 무작위 토큰열
+# 2) CLOVA 응답 형태의 가짜 페이지 전체 파이프라인 (텍스트 추출 + 수정용 필터)
+# 사용법: python bench/check_blank_rules.py [--cases 2000] [--pages 50]
+import argparse
+import io
+import random
+import contextlib
+from bench_utils import synthetic_ocr_page, timeit
+from utils.blank_rules import apply_gap_rules, apply_filter_rules
+from utils.text_tokens import ROW_TOL, FIXED_BLANK_WIDTH
+from utils.common import cluster_lines
+from utils.filter_tokens import blank_date_line_digits
+
+BLANK_TOKEN = "[BLANK]"
+
+# --- 이전 구현 (text_tokens / filter_tokens에서 그대로 옮김) ---
+def reference_text_blanks(tokens, bboxes):
+    new_tokens = []
+    new_bboxes = []
+    for i in range(len(tokens) - 1):
+        curr_token = tokens[i]
+        next_token = tokens[i + 1]
+        curr_box = bboxes[i]
+        next_box = bboxes[i + 1]
+
+        new_tokens.append(curr_token)
+        new_bboxes.append(curr_box)
+
+        if curr_token == ":":
+            j = i + 1
+            found_in = False
+            while j < len(tokens):
+                if tokens[j] == "(인)":
+                    found_in = True
+                    break
+                elif tokens[j] != BLANK_TOKEN:
+                    found_in = False
+                    break
+                j += 1
+
+            if found_in:
+                if abs(curr_box[1] - next_box[1]) <= ROW_TOL:
+                    blank_box = [curr_box[2], min(curr_box[1], next_box[1]), next_box[0], max(curr_box[3], next_box[3])]
+                else:
+                    blank_box = [curr_box[2], curr_box[1], curr_box[2] + 500, curr_box[3]]
+                new_tokens.append(BLANK_TOKEN)
+                new_bboxes.append(blank_box)
+
+        if next_token in FIXED_BLANK_WIDTH and len(next_token.strip()) == 1:
+            if curr_token.isdigit():
+                continue
+            if abs(curr_box[1] - next_box[1]) <= ROW_TOL:
+                blank_box = [curr_box[2], min(curr_box[1], next_box[1]), next_box[0], max(curr_box[3], next_box[3])]
+            else:
+                w = FIXED_BLANK_WIDTH[next_token]
+                blank_box = [next_box[0] - w, next_box[1], next_box[0], next_box[3]]
+            new_tokens.append(BLANK_TOKEN)
+            new_bboxes.append(blank_box)
+
+    new_tokens.append(tokens[-1])
+    new_bboxes.append(bboxes[-1])
+    return new_tokens, new_bboxes
+
+def reference_merge_inline_blanks(tokens, bboxes, date_y_set, y_tol=5, max_gap=30):
+    merged_tokens, merged_bboxes = [], []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        bbox = bboxes[i]
+        if token == BLANK_TOKEN and any(abs(bbox[1] - y) <= y_tol for y in date_y_set):
+            merged_bbox = bbox.copy()
+            j = i + 1
+            while (
+                j < len(tokens)
+                and tokens[j] == BLANK_TOKEN
+                and abs(bboxes[j][1] - bbox[1]) <= y_tol
+                and bboxes[j][0] - merged_bbox[2] <= max_gap
+            ):
+                next_bbox = bboxes[j]
+                merged_bbox = [
+                    min(merged_bbox[0], next_bbox[0]),
+                    min(merged_bbox[1], next_bbox[1]),
+                    max(merged_bbox[2], next_bbox[2]),
+                    max(merged_bbox[3], next_bbox[3]),
+                ]
+                j += 1
+            merged_tokens.append(BLANK_TOKEN)
+            merged_bboxes.append(merged_bbox)
+            i = j
+        else:
+            merged_tokens.append(token)
+            merged_bboxes.append(bbox)
+            i += 1
+    return merged_tokens, merged_bboxes
+
+def reference_inject_blank_between_colon_and_seal(tokens, bboxes):
+    result_tokens, result_bboxes = [], []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        bbox = bboxes[i]
+        if token == ":":
+            j = i + 1
+            found = False
+            while j < len(tokens):
+                if tokens[j] == "(인)":
+                    found = True
+                    break
+                j += 1
+            if found and j > i + 1:
+                merged_bbox = list(bboxes[i + 1])
+                for k in range(i + 2, j):
+                    merged_bbox = [
+                        min(merged_bbox[0], bboxes[k][0]),
+                        min(merged_bbox[1], bboxes[k][1]),
+                        max(merged_bbox[2], bboxes[k][2]),
+                        max(merged_bbox[3], bboxes[k][3]),
+                    ]
+                merged_bbox[2] = bboxes[j][0]
+                result_tokens.extend([token, BLANK_TOKEN, tokens[j]])
+                result_bboxes.extend([bbox, merged_bbox, bboxes[j]])
+                i = j + 1
+                continue
+        result_tokens.append(token)
+        result_bboxes.append(bbox)
+        i += 1
+    return result_tokens, result_bboxes
+
+def reference_filter_rules(tokens, bboxes, in_table, allowed_fields, blank_indices):
+    filtered_tokens, filtered_bboxes = [], []
+    for i, (token, bbox) in enumerate(zip(tokens, bboxes)):
+        if token == BLANK_TOKEN or i in blank_indices:
+            filtered_tokens.append(BLANK_TOKEN)
+        elif in_table[i]:
+            filtered_tokens.append(token if token in allowed_fields else BLANK_TOKEN)
+        else:
+            filtered_tokens.append(token)
+        filtered_bboxes.append(bbox)
+    date_line_y1_set = {box[1] for tok, box in zip(filtered_tokens, filtered_bboxes) if tok in {"년", "월", "일"}}
+    merged_tokens, merged_bboxes = reference_merge_inline_blanks(filtered_tokens, filtered_bboxes, date_line_y1_set)
+    return reference_inject_blank_between_colon_and_seal(merged_tokens, merged_bboxes)
+
+# --- 무작위 토큰열 ---
+RULE_TOKENS = [":", ":", "(인)", BLANK_TOKEN, BLANK_TOKEN, "년", "월", "일", "12", "2024", "성명", "주소", "(서명)"]
+
+def random_case(rng):
+    n = rng.randint(1, 60)
+    tokens, bboxes = [], []
+    x, y = 0, rng.randint(0, 50)
+    for _ in range(n):
+        if rng.random() < 0.25:
+            x, y = rng.randint(0, 100), y + rng.choice([3, 8, 12, 16, 22, 40])
+        w = rng.randint(5, 60)
+        tokens.append(rng.choice(RULE_TOKENS))
+        bboxes.append([x, y + rng.randint(0, 6), x + w, y + 18])
+        x += w + rng.randint(0, 40)
+    in_table = [rng.random() < 0.2 for _ in tokens]
+    allowed = {"성명", "주소", ":", "(인)", "년"} if rng.random() < 0.5 else {"성명"}
+    return tokens, bboxes, in_table, allowed
+
+def check_random(cases, seed=0):
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(cases):
+        tokens, bboxes, in_table, allowed = random_case(rng)
+        if apply_gap_rules(tokens, bboxes, ROW_TOL, FIXED_BLANK_WIDTH) != reference_text_blanks(tokens, bboxes):
+            mismatches += 1
+            continue
+        _, lines_by_y = cluster_lines(bboxes, tolerance=10)
+        blank_indices = blank_date_line_digits(tokens, bboxes, lines_by_y)
+        got = apply_filter_rules(tokens, bboxes, in_table, allowed, blank_indices)
+        if got != reference_filter_rules(tokens, bboxes, in_table, allowed, blank_indices):
+            mismatches += 1
+    return mismatches
+
+def check_pages(pages):
+    from utils.pipeline import extract_tokens
+    from utils.geometry import PageGeometry
+    import utils.text_tokens as text_tokens
+
+    mismatches = 0
+    for seed in range(pages):
+        page = synthetic_ocr_page(n_fields=50 + seed * 20, n_tables=seed % 5, seed=seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            doc = extract_tokens(page)
+            # 규칙 엔진 대신 이전 구현으로 같은 텍스트 단계를 다시 실행해 비교
+            original = text_tokens.apply_gap_rules
+            text_tokens.apply_gap_rules = lambda t, b, *args: reference_text_blanks(t, b)
+            try:
+                ref_doc = extract_tokens(page)
+            finally:
+                text_tokens.apply_gap_rules = original
+        if doc != ref_doc:
+            mismatches += 1
+            continue
+
+        tokens, bboxes = doc.tokens, doc.bbox_list()
+
+        in_table = PageGeometry.from_ocr(page).overlaps_tables(bboxes).tolist()
+        allowed = set(tokens[::7])
+        _, lines_by_y = cluster_lines(bboxes, tolerance=10)
+        blank_indices = blank_date_line_digits(tokens, bboxes, lines_by_y)
+        if apply_filter_rules(tokens, bboxes, in_table, allowed, blank_indices) != \
+                reference_filter_rules(tokens, bboxes, in_table, allowed, blank_indices):
+            mismatches += 1
+    return mismatches
+
+def colon_heavy(n):
+    # ":"가 많고 "(인)"이 없는 양식: 이전 구현은 ":"마다 목록 끝까지 "(인)"을 찾음 (O(n²))
+    tokens = [":" if i % 2 else "성명" for i in range(n)]
+    bboxes = [[i % 900, (i // 30) * 22, i % 900 + 10, (i // 30) * 22 + 18] for i in range(n)]
+    return tokens, bboxes
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"무작위 토큰열 {args.cases}개 불일치: {check_random(args.cases)}")
+    print(f"가짜 페이지 {args.pages}개 불일치: {check_pages(args.pages)}")
+
+    print(f"\n{'tokens':>7}{'old p50':>11}{'rules p50':>11}  (\":\" 많은 양식, 필터 단계)")
+    for n in [500, 1000, 2000, 4000]:
+        tokens, bboxes = colon_heavy(n)
+        in_table = [False] * len(tokens)
+        old = timeit(lambda: reference_filter_rules(tokens, bboxes, in_table, set(), set()), repeat=5, warmup=1)
+        new = timeit(lambda: apply_filter_rules(tokens, bboxes, in_table, set(), set()), repeat=5, warmup=1)
+        print(f"{len(tokens):>7}{old['p50_ms']:>11}{new['p50_ms']:>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# 스캔 기하 보정: SCAN_DESKEW_MODE=separate (원근 보정 → 보정(이진화) → Hough deskew 회전, 리샘플링 2번)
+#   vs combined (축소본에서 가로줄/세로줄 각도를 재서 원근 행렬에 합치고 한 번에 리샘플링)
+# 내용이 비뚤게 인쇄된 가짜 촬영 사진(bench_utils.synthetic_photo의 skew)으로 각도, 기하 보정 시간, 글자 픽셀 F1, 회색 픽셀 비율을 비교
+# 회색 픽셀 = 0/255가 아닌 픽셀 비율 (이진화된 글자를 다시 회전하면 획 가장자리가 흐려져 늘어남)
+# 남은 기울기 = 결과 이미지에서 투영 프로파일(±2도, 0.05도 간격)로 다시 잰 글자 줄 각도의 절댓값 (0이면 줄이 수평)
+# 각도 = 보정한 각도 (separate는 펼친 문서에서 잰 가로줄 각도, combined는 paper_skew_angle로 환산한 종이 기준 각도)
+# 시간 = 원근 보정 + deskew (보정 단계 제외), 사진 크기별로 --size를 바꿔 실행 (8MP 3264x2448, 2MP 1632x1224)
+# 사용법: python bench/check_scan_deskew.py [--skews -3 -1 0 1 3] [--fixtures 3] [--quality fast]
+import io
+import argparse
+import contextlib
+import cv2
+import numpy as np
+from bench_utils import synthetic_page, synthetic_photo, timeit
+from bench_scan_quality import ocr_readiness
+from utils.scanner import (find_document_corners, apply_perspective_transform, enhance_image, deskew_image,
+                           estimate_page_skew, estimate_skew_angle, refine_skew_angle, paper_skew_angle)
+
+def two_resamples(photo, corners, quality):
+    warped = apply_perspective_transform(photo, corners)
+    return deskew_image(enhance_image(warped, quality))
+
+def one_resample(photo, corners, quality):
+    skew = estimate_page_skew(photo, corners)
+    return enhance_image(apply_perspective_transform(photo, corners, skew), quality)
+
+def residual_skew(image):
+    binary = np.where(image < 128, 0, 255).astype(np.uint8)
+    return abs(refine_skew_angle(cv2.Canny(binary, 50, 150), 0.0, span=2.0, step=0.05))
+
+def gray_ratio(image):
+    return float(((image > 0) & (image < 255)).mean())
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skews", type=float, nargs="+", default=[-3, -1, 0, 1, 3])
+    parser.add_argument("--fixtures", type=int, default=3)
+    parser.add_argument("--size", type=int, nargs=2, default=[3264, 2448], help="촬영 사진 크기 (가로 세로)")
+    parser.add_argument("--quality", default="fast", help="보정 품질 단계 (두 방식 모두 같은 단계 사용)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"촬영 사진 {args.size[0]}x{args.size[1]}, quality={args.quality}, 시간 = 원근 보정 + deskew (보정 단계 제외) p50")
+    print(f"{'skew':>6}{'2x angle':>10}{'1x angle':>10}{'2x resid':>10}{'1x resid':>10}{'2x ms':>9}{'1x ms':>9}"
+          f"{'2x F1':>8}{'1x F1':>8}{'2x gray':>9}{'1x gray':>9}")
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    for skew in args.skews:
+        rows = []
+        for seed in range(args.fixtures):
+            photo, _ = synthetic_photo(tuple(args.size), seed=seed, noise=5.0, skew=skew)
+            corners = find_document_corners(photo)
+            page = synthetic_page(seed=seed)
+            with quiet:
+                warped = apply_perspective_transform(photo, corners)
+                enhanced = enhance_image(warped, args.quality)
+                old_angle = estimate_skew_angle(enhanced) or 0.0
+                new_angle = paper_skew_angle(estimate_page_skew(photo, corners))
+                old = two_resamples(photo, corners, args.quality)
+                new = one_resample(photo, corners, args.quality)
+                if seed == 0:
+                    old_ms = timeit(lambda: (apply_perspective_transform(photo, corners), deskew_image(enhanced)),
+                                    repeat=args.repeat, warmup=1)["p50_ms"]
+                    new_ms = timeit(lambda: apply_perspective_transform(photo, corners, estimate_page_skew(photo, corners)),
+                                    repeat=args.repeat, warmup=1)["p50_ms"]
+            rows.append((old_angle, new_angle, residual_skew(old), residual_skew(new),
+                         ocr_readiness(old, page)[2], ocr_readiness(new, page)[2], gray_ratio(old), gray_ratio(new)))
+        old_angle, new_angle, old_resid, new_resid, old_f1, new_f1, old_gray, new_gray = np.mean(rows, axis=0)
+        print(f"{skew:>6.1f}{old_angle:>10.2f}{new_angle:>10.2f}{old_resid:>10.2f}{new_resid:>10.2f}{old_ms:>9.1f}{new_ms:>9.1f}"
+              f"{old_f1:>8.3f}{new_f1:>8.3f}{old_gray:>9.4f}{new_gray:>9.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# 스캐너 문서 윤곽 검출: 원본 해상도(full) vs 축소본 + 꼭짓점 보정(coarse)
+# 정답 꼭짓점을 아는 가짜 촬영 사진(밝은 책상 위에 원근 변형된 흰 문서, bench_utils.synthetic_photo)으로 꼭짓점 오차와 검출 시간을 비교
+# 사용법: python bench/check_scanner_detection.py [--fixtures 20] [--repeat 5]
+import argparse
+import numpy as np
+from bench_utils import synthetic_photo, timeit
+from utils.scanner import find_document_corners, order_points, apply_perspective_transform
+
+RESOLUTIONS = [(1600, 1200), (2592, 1944), (3264, 2448), (4000, 3000)]  # 2MP, 5MP, 8MP, 12MP
+
+def corner_error(found, truth):
+    return float(np.linalg.norm(order_points(found) - order_points(truth), axis=1).max())
+
+def detect_and_warp(photo, mode):
+    return apply_perspective_transform(photo, find_document_corners(photo, mode=mode))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=5.0, help="꼭짓점 최대 오차가 이 값(px) 이하이면 검출 성공")
+    args = parser.parse_args()
+
+    print(f"꼭짓점 오차 = 네 꼭짓점 중 정답과 가장 먼 거리(px), 성공 기준 {args.tolerance}px, 시간 = 윤곽 검출 + 원근 보정")
+    print(f"{'resolution':>11}{'full ok':>9}{'coarse ok':>11}{'full err':>10}{'coarse err':>12}{'coarse max':>12}"
+          f"{'full ms':>10}{'coarse ms':>11}{'speedup':>9}")
+    for size in RESOLUTIONS:
+        errors = {"full": [], "coarse": []}
+        timings = {"full": [], "coarse": []}
+        for seed in range(args.fixtures):
+            photo, truth = synthetic_photo(size, seed=seed)
+            for mode in errors:
+                try:
+                    errors[mode].append(corner_error(find_document_corners(photo, mode=mode), truth))
+                except Exception:
+                    errors[mode].append(float("inf"))
+                if seed < 3:
+                    timings[mode].append(timeit(lambda: detect_and_warp(photo, mode), repeat=args.repeat, warmup=1)["p50_ms"])
+
+        ok = {mode: [e for e in errs if e <= args.tolerance] for mode, errs in errors.items()}
+        full_ms, coarse_ms = float(np.median(timings["full"])), float(np.median(timings["coarse"]))
+        print(f"{size[0]:>5}x{size[1]:<5}{len(ok['full']):>5}/{args.fixtures:<3}{len(ok['coarse']):>7}/{args.fixtures:<3}"
+              f"{np.mean(ok['full']):>10.2f}{np.mean(ok['coarse']):>12.2f}{np.max(ok['coarse']):>12.2f}"
+              f"{full_ms:>10.1f}{coarse_ms:>11.1f}{full_ms / coarse_ms:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# PyTorch vs ONNX Runtime(fp32 / int8) 라벨 일치율과 지연시간 비교
+# 저장된 토큰/bbox 픽스처(JSON: {"tokens": [...], "bboxes": [...]})를 사용
+# EYEON_DEBUG_ARTIFACTS=1로 저장한 data/debug/*/ocr_tokens*.json을 그대로 쓸 수 있음
+# 사용법: python bench/compare_backends.py --fixtures data/debug [--synthetic 10]
+import os
+import glob
+import json
+import argparse
+from collections import defaultdict
+
+# 비교용 벤치이므로 ONNX 파일이 없으면 그 자리에서 내보냄 (서버는 python -m utils.onnx_backend로 미리 내보냄)
+os.environ.setdefault("LAYOUTLM_ONNX_AUTO_EXPORT", "1")
+
+from bench_utils import TYPICAL_WORD_COUNTS, synthetic_document, timeit
+from utils.common import detect_doc_type
+from utils.layoutlm_inference import run_layoutlm_batch
+from utils.document_tokens import DocumentTokens
+
+VARIANTS = [
+    ("onnx_fp32", "onnx", False),
+    ("onnx_int8", "onnx", True),
+]
+
+def load_fixtures(fixture_dir):
+    documents = defaultdict(list)
+    pattern = os.path.join(fixture_dir, "**", "*.json")
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or "tokens" not in data or "bboxes" not in data:
+            continue
+        doctype = detect_doc_type(data["tokens"])
+        if doctype and data["tokens"]:
+            documents[doctype].append(DocumentTokens(data["tokens"], data["bboxes"]))
+    return documents
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", help="토큰/bbox JSON 픽스처 디렉토리")
+    parser.add_argument("--synthetic", type=int, default=0, help="문서 유형별 합성 문서 수 (픽스처가 없을 때)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    documents = load_fixtures(args.fixtures) if args.fixtures else defaultdict(list)
+    if args.synthetic:
+        for doctype, n_words in TYPICAL_WORD_COUNTS.items():
+            for seed in range(args.synthetic):
+                documents[doctype].append(synthetic_document(doctype, n_words, seed=seed))
+    if not documents:
+        parser.error("--fixtures 또는 --synthetic 중 하나는 필요합니다.")
+
+    report = {}
+    for doctype, docs in sorted(documents.items()):
+        reference = [run_layoutlm_batch(doctype, [doc], backend="torch")[0]["labels"] for doc in docs]
+        sample = docs[0]
+        row = {
+            "documents": len(docs),
+            "words": sum(len(labels) for labels in reference),
+            "torch": timeit(lambda: run_layoutlm_batch(doctype, [sample], backend="torch"), repeat=args.repeat),
+        }
+        for name, backend, quantize in VARIANTS:
+            predicted = [
+                run_layoutlm_batch(doctype, [doc], backend=backend, quantize=quantize)[0]["labels"]
+                for doc in docs
+            ]
+            same_words = sum(a == b for ref, pred in zip(reference, predicted) for a, b in zip(ref, pred))
+            same_docs = sum(ref == pred for ref, pred in zip(reference, predicted))
+            row[name] = {
+                "label_agreement": round(same_words / row["words"], 4) if row["words"] else None,
+                "identical_documents": same_docs,
+                **timeit(lambda: run_layoutlm_batch(doctype, [sample], backend=backend, quantize=quantize), repeat=args.repeat),
+            }
+        report[doctype] = row
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+from bisect import bisect_left
+from collections import namedtuple
+
+# --- [BLANK] 삽입/병합 규칙 엔진 ---
+# 텍스트 추출 단계와 수정용 필터 단계의 빈칸 규칙을 아래 규칙 표로 선언하고,
+# 토큰 목록을 한 번만 훑는 실행기로 묶어서 적용
+# 규칙이 앞쪽을 찾아봐야 하는 정보(다음 "(인)" 위치, 날짜 줄 y 목록 등)는 시작 전에 한 번에 계산
+
+BLANK_TOKEN = "[BLANK]"
+SEAL_TOKEN = "(인)"
+DATE_UNITS = {"년", "월", "일"}
+
+def next_index(size, match):
+    # nxt[i] = i 이상에서 match(i)가 참인 첫 위치 (없으면 size), 뒤에서부터 한 번에 계산
+    nxt = [size] * (size + 1)
+    for i in range(size - 1, -1, -1):
+        nxt[i] = i if match(i) else nxt[i + 1]
+    return nxt
+
+def union_bbox(boxes):
+    merged = list(boxes[0])
+    for box in boxes[1:]:
+        merged = [
+            min(merged[0], box[0]),
+            min(merged[1], box[1]),
+            max(merged[2], box[2]),
+            max(merged[3], box[3]),
+        ]
+    return merged
+
+# --- 텍스트 단계: 인접한 두 토큰 사이에 [BLANK] 삽입 ---
+GapRule = namedtuple("GapRule", ["name", "when", "blank_box"])
+
+class _GapContext:
+    def __init__(self, tokens, bboxes, row_tol, fixed_blank_width):
+        self.tokens = tokens
+        self.bboxes = bboxes
+        self.row_tol = row_tol
+        self.fixed_blank_width = fixed_blank_width
+        # [BLANK]가 아닌 다음 토큰 위치 (":" 뒤에 빈칸만 있고 바로 "(인)"이 오는지 O(1)로 확인)
+        self.next_non_blank = next_index(len(tokens), lambda i: tokens[i] != BLANK_TOKEN)
+
+    def same_row(self, i):
+        return abs(self.bboxes[i][1] - self.bboxes[i + 1][1]) <= self.row_tol
+
+    def box_between(self, i):
+        curr_box, next_box = self.bboxes[i], self.bboxes[i + 1]
+        return [curr_box[2], min(curr_box[1], next_box[1]), next_box[0], max(curr_box[3], next_box[3])]
+
+def _colon_before_seal(ctx, i):
+    if ctx.tokens[i] != ":":
+        return False
+    j = ctx.next_non_blank[i + 1]
+    return j < len(ctx.tokens) and ctx.tokens[j] == SEAL_TOKEN
+
+def _colon_blank_box(ctx, i):
+    # 같은 줄이면 ":"와 다음 토큰 사이, 아니면 ":" 오른쪽에 넓게
+    if ctx.same_row(i):
+        return ctx.box_between(i)
+    curr_box = ctx.bboxes[i]
+    return [curr_box[2], curr_box[1], curr_box[2] + 500, curr_box[3]]
+
+def _before_date_unit(ctx, i):
+    # 앞 토큰이 숫자면 이미 값이 있으므로 삽입하지 않음
+    next_token = ctx.tokens[i + 1]
+    return (
+        next_token in ctx.fixed_blank_width
+        and len(next_token.strip()) == 1
+        and not ctx.tokens[i].isdigit()
+    )
+
+def _date_blank_box(ctx, i):
+    # 같은 줄이면 사이에, 아니면 단위 왼쪽에 고정폭으로
+    if ctx.same_row(i):
+        return ctx.box_between(i)
+    next_token, next_box = ctx.tokens[i + 1], ctx.bboxes[i + 1]
+    w = ctx.fixed_blank_width[next_token]
+    return [next_box[0] - w, next_box[1], next_box[0], next_box[3]]
+
+# 위에서부터 순서대로 검사하고, 맞는 규칙마다 [BLANK]를 하나씩 삽입
+TEXT_GAP_RULES = (
+    GapRule("colon_before_seal", _colon_before_seal, _colon_blank_box),   # ":" 뒤에 (빈칸만 지나) "(인)"이 오면
+    GapRule("before_date_unit", _before_date_unit, _date_blank_box),      # "년"/"월"/"일" 앞
+)
+
+def apply_gap_rules(tokens, bboxes, row_tol, fixed_blank_width, rules=TEXT_GAP_RULES):
+    ctx = _GapContext(tokens, bboxes, row_tol, fixed_blank_width)
+    new_tokens, new_bboxes = [], []
+    for i in range(len(tokens) - 1):
+        new_tokens.append(tokens[i])
+        new_bboxes.append(bboxes[i])
+        for rule in rules:
+            if rule.when(ctx, i):
+                new_tokens.append(BLANK_TOKEN)
+                new_bboxes.append(rule.blank_box(ctx, i))
+
+    # 마지막 토큰 추가
+    new_tokens.append(tokens[-1])
+    new_bboxes.append(bboxes[-1])
+    return new_tokens, new_bboxes
+
+# --- 필터 단계: 토큰 치환 + 구간 병합 ---
+# 토큰 규칙: 처음 맞는 규칙 하나로 토큰을 바꿈 (bbox는 그대로)
+# 구간 규칙: 시작 조건에 맞는 토큰부터 extends가 참인 동안 이어 붙인 구간을 emit 결과로 바꿈
+#            (span_box: 지금까지 구간 bbox의 합집합, 구간을 늘릴 때마다 갱신)
+#            규칙마다 앞 규칙의 출력을 입력으로 받으며, 모든 규칙이 제너레이터로 이어져 토큰을 한 번만 훑음
+TokenRule = namedtuple("TokenRule", ["name", "when", "replace"])
+SpanRule = namedtuple("SpanRule", ["name", "starts", "extends", "emit"])
+Item = namedtuple("Item", ["index", "token", "bbox"])  # index: 입력 목록에서의 위치
+
+class _FilterContext:
+    def __init__(self, tokens, bboxes, in_table, allowed_fields, date_digit_indices, y_tol, max_gap):
+        self.tokens = tokens
+        self.bboxes = bboxes
+        self.in_table = in_table
+        self.allowed_fields = allowed_fields
+        self.date_digit_indices = date_digit_indices
+        self.y_tol = y_tol
+        self.max_gap = max_gap
+
+        size = len(tokens)
+        # 토큰 규칙 적용 후에도 "(인)"으로 남는 다음 위치
+        self.next_seal = next_index(
+            size, lambda i: tokens[i] == SEAL_TOKEN and self.filtered_token(i) == SEAL_TOKEN
+        )
+        # 토큰 규칙 적용 후 "년"/"월"/"일"이 있는 줄의 y1 (정렬해 두고 이분 탐색)
+        self.date_line_ys = sorted({
+            bboxes[i][1] for i in range(size)
+            if tokens[i] in DATE_UNITS and self.filtered_token(i) in DATE_UNITS
+        })
+
+    def filtered_token(self, i):
+        for rule in FILTER_TOKEN_RULES:
+            if rule.when(self, i):
+                return rule.replace(self, i)
+        return self.tokens[i]
+
+    def near_date_line(self, y):
+        ys = self.date_line_ys
+        k = bisect_left(ys, y - self.y_tol)
+        return k < len(ys) and ys[k] <= y + self.y_tol
+
+    def seal_ahead(self, item):
+        return self.next_seal[item.index + 1] < len(self.tokens)
+
+def _merge_date_blanks_extends(ctx, span, span_box, item):
+    return (
+        item.token == BLANK_TOKEN
+        and abs(item.bbox[1] - span[0].bbox[1]) <= ctx.y_tol
+        and item.bbox[0] - span_box[2] <= ctx.max_gap
+    )
+
+def _colon_to_seal_emit(ctx, span, span_box):
+    # ":"와 "(인)" 사이에 다른 토큰이 있으면 전부 하나의 [BLANK]로 합치고 오른쪽 끝을 "(인)" 왼쪽에 맞춤
+    colon, middle, seal = span[0], span[1:-1], span[-1]
+    if not middle:
+        return span
+    blank_box = union_bbox([part.bbox for part in middle])
+    blank_box[2] = seal.bbox[0]
+    return [colon, Item(middle[0].index, BLANK_TOKEN, blank_box), seal]
+
+FILTER_TOKEN_RULES = (
+    # 날짜 줄의 숫자는 값이므로 빈칸으로
+    TokenRule("keep_blank", lambda ctx, i: ctx.tokens[i] == BLANK_TOKEN or i in ctx.date_digit_indices,
+              lambda ctx, i: BLANK_TOKEN),
+    # 테이블 안 토큰은 라벨 키워드만 남기고 빈칸으로
+    TokenRule("table_value", lambda ctx, i: ctx.in_table[i],
+              lambda ctx, i: ctx.tokens[i] if ctx.tokens[i] in ctx.allowed_fields else BLANK_TOKEN),
+)
+
+FILTER_SPAN_RULES = (
+    # 날짜 줄의 연속된 [BLANK]를 하나로 병합
+    SpanRule(
+        "merge_date_blanks",
+        starts=lambda ctx, item: item.token == BLANK_TOKEN and ctx.near_date_line(item.bbox[1]),
+        extends=_merge_date_blanks_extends,
+        emit=lambda ctx, span, span_box: [Item(span[0].index, BLANK_TOKEN, span_box)],
+    ),
+    # ":" ... "(인)" 사이를 하나의 [BLANK]로
+    SpanRule(
+        "colon_to_seal",
+        starts=lambda ctx, item: item.token == ":" and ctx.seal_ahead(item),
+        extends=lambda ctx, span, span_box, item: span[-1].token != SEAL_TOKEN or len(span) == 1,
+        emit=_colon_to_seal_emit,
+    ),
+)
+
+def _token_stage(ctx):
+    for i, bbox in enumerate(ctx.bboxes):
+        yield Item(i, ctx.filtered_token(i), bbox)
+
+def _span_stage(ctx, rule, items):
+    starts, extends, emit = rule.starts, rule.extends, rule.emit
+    span = span_box = None
+    for item in items:
+        if span is not None:
+            if extends(ctx, span, span_box, item):
+                span.append(item)
+                span_box = union_bbox([span_box, item.bbox])
+                continue
+            yield from emit(ctx, span, span_box)
+            span = None
+        if starts(ctx, item):
+            span, span_box = [item], list(item.bbox)
+        else:
+            yield item
+    if span is not None:
+        yield from emit(ctx, span, span_box)
+
+def apply_filter_rules(tokens, bboxes, in_table, allowed_fields, date_digit_indices, y_tol=5, max_gap=30):
+    ctx = _FilterContext(tokens, bboxes, in_table, allowed_fields, date_digit_indices, y_tol, max_gap)
+    items = _token_stage(ctx)
+    for rule in FILTER_SPAN_RULES:
+        items = _span_stage(ctx, rule, items)
+
+    final_tokens, final_bboxes = [], []
+    for item in items:
+        final_tokens.append(item.token)
+        final_bboxes.append(item.bbox)
+    return final_tokens, final_bboxes
@@ -1,10 +1,14 @@
 import os
 import json
 import re
+import numpy as np
+from types import MappingProxyType
+from utils.config import DEBUG_ARTIFACTS
 
 # --- 디렉토리 경로 상수 ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # 프로젝트 루트
 DATA_DIR = os.path.join(BASE_DIR, "data")
+DEBUG_DIR_NAME = "debug"
 
 OCR_RESULT_PATH = os.path.join(DATA_DIR, "ocr_result.json")
 OCR_TOKENS_PATH = os.path.join(DATA_DIR, "ocr_tokens.json")
@@ -13,18 +17,25 @@ OCR_TOKENS_FROM_TABLE_PATH = os.path.join(DATA_DIR, "ocr_tokens_from_table.json"
 OCR_TOKENS_FROM_TEXT_PATH = os.path.join(DATA_DIR, "ocr_tokens_from_text.json")
 LABEL_KEYWORDS_PATH = os.path.join(DATA_DIR, "label_keywords.json")
 
+# --- 지원 문서 유형 ---
+DOC_TYPES = ("resume", "certificate", "consent", "self_intro", "report")
+
 # --- 문서 유형 판단 함수 ---
+# 제목 토큰 → 문서 유형 (토큰 전체가 제목과 정확히 같을 때만 인정, 토큰당 dict 조회 한 번)
+TITLE_DOC_TYPES = MappingProxyType({
+    "이력서": "resume",
+    "재직증명서": "certificate",
+    "위임장": "consent",
+    "자기소개서": "self_intro",
+    "일일업무보고서": "report",
+    "일일업무일지": "report",
+})
+
 def detect_doc_type(tokens):
     for token in tokens:
-        if token in {"이력서", "재직증명서", "위임장", "자기소개서", "일일업무보고서", "일일업무일지"}:
-            return {
-                "이력서": "resume",
-                "재직증명서": "certificate",
-                "위임장": "consent",
-                "자기소개서": "self_intro",
-                "일일업무보고서": "report",
-                "일일업무일지": "report"
-            }[token]
+        doctype = TITLE_DOC_TYPES.get(token)
+        if doctype:
+            return doctype
     return None
 
 # --- bbox 정규화 함수 ---
@@ -43,6 +54,12 @@ def save_json(filename: str, data: dict):
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
+def save_debug_json(run_id: str, filename: str, data: dict):
+    # 디버그 모드에서만 요청별 디렉토리에 중간 결과 저장 (동시 요청 간 덮어쓰기 방지)
+    if not DEBUG_ARTIFACTS:
+        return
+    save_json(os.path.join(DEBUG_DIR_NAME, run_id, filename), data)
+
 def load_json(filename: str):
     if not filename.endswith(".json"):
         filename += ".json"
@@ -56,32 +73,37 @@ def remove_number_dot_prefix(text: str) -> str:
 def remove_spaces_from_tokens(tokens):
     return [token.replace(" ", "") for token in tokens]
 
+# --- 줄(행) 묶기 ---
+# y1 기준으로 한 번 정렬한 뒤 위에서부터 훑으며 줄을 나눔 (O(n log n), 입력 순서와 무관)
+# 줄의 기준 y(그 줄에서 가장 위 y1)와의 차이가 tolerance 이내면 같은 줄
+# 반환: 입력 순서대로 각 y1이 속한 줄의 기준 y1의 인덱스
+def line_ref_indices(ys, tolerance=5):
+    values = ys.tolist() if isinstance(ys, np.ndarray) else list(ys)
+    refs = np.empty(len(values), dtype=np.intp)
+    ref = None
+    for i in np.argsort(np.asarray(values), kind="stable").tolist():
+        if ref is None or values[i] - values[ref] > tolerance:
+            ref = i
+        refs[i] = ref
+    return refs
+
+# 각 y1이 속한 줄의 기준 y (NumPy 배열, 병합 정렬용)
+def line_refs(ys, tolerance=5):
+    ys = np.asarray(ys)
+    return ys[line_ref_indices(ys, tolerance)]
+
+# 반환: (y1 → 줄 기준 y 맵, 줄 기준 y → 인덱스 목록(입력 순서) 맵, 줄은 위에서부터)
+def cluster_lines(bboxes, tolerance=5):
+    ys = [bbox[1] for bbox in bboxes]
+    refs = line_ref_indices(ys, tolerance).tolist()
+    norm_y_map = {y: ys[ref] for y, ref in zip(ys, refs)}
+    lines = {ys[ref]: [] for ref in sorted(set(refs), key=lambda ref: ys[ref])}
+    for i, ref in enumerate(refs):
+        lines[ys[ref]].append(i)
+    return norm_y_map, lines
+
 def group_lines_by_y(bboxes, tolerance=5):
-    y_groups = []
-    norm_y_map = {}
-    for box in bboxes:
-        y = box[1]
-        found = False
-        for ref_y in y_groups:
-            if abs(ref_y - y) <= tolerance:
-                norm_y_map[y] = ref_y
-                found = True
-                break
-        if not found:
-            y_groups.append(y)
-            norm_y_map[y] = y
-    return norm_y_map
+    return cluster_lines(bboxes, tolerance)[0]
 
 def group_lines_by_y_for_filter(bboxes, tolerance=5):
-    lines = {}
-    for i, box in enumerate(bboxes):
-        y1 = box[1]
-        found = False
-        for ref_y in lines:
-            if abs(ref_y - y1) <= tolerance:
-                lines[ref_y].append(i)
-                found = True
-                break
-        if not found:
-            lines[y1] = [i]
-    return lines
+    return cluster_lines(bboxes, tolerance)[1]
@@ -0,0 +1,33 @@
+import os
+from dotenv import load_dotenv
+
+# --- 환경 변수 로드 ---
+load_dotenv()
+
+def env_str(name, default=None):
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+def env_bool(name, default=False):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+def env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+def env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+def env_list(name, default=()):
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+# --- 파이프라인 설정 ---
+# 켜져 있을 때만 단계별 중간 결과를 data/debug/<요청ID>/ 아래에 저장
+DEBUG_ARTIFACTS = env_bool("EYEON_DEBUG_ARTIFACTS")
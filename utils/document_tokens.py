@@ -0,0 +1,60 @@
+import numpy as np
+
+# --- 문서 토큰 표현 ---
+# 토큰 문자열 목록 + (N, 4) int32 연속 배열 bbox를 한 객체로 묶어 단계 사이에 전달
+# bbox마다 파이썬 리스트를 만들지 않고, 정렬/선택/이어 붙이기는 인덱스 배열 한 번으로 처리
+# JSON 응답·디버그 저장처럼 리스트가 필요한 곳에서만 to_dict()/bbox_list()로 변환
+BBOX_DTYPE = np.int32
+
+def as_bbox_array(bboxes):
+    if bboxes is None:
+        return np.empty((0, 4), dtype=BBOX_DTYPE)
+    return np.ascontiguousarray(np.asarray(bboxes, dtype=BBOX_DTYPE).reshape(-1, 4))
+
+class DocumentTokens:
+    __slots__ = ("tokens", "bboxes")
+
+    def __init__(self, tokens=(), bboxes=None):
+        self.tokens = list(tokens)
+        self.bboxes = as_bbox_array(bboxes)
+        if len(self.tokens) != len(self.bboxes):
+            raise ValueError(f"토큰 수({len(self.tokens)})와 bbox 수({len(self.bboxes)})가 다릅니다.")
+
+    @classmethod
+    def concat(cls, *docs):
+        doc = cls.__new__(cls)
+        doc.tokens = [token for d in docs for token in d.tokens]
+        doc.bboxes = np.concatenate([d.bboxes for d in docs]) if docs else as_bbox_array(None)
+        return doc
+
+    def take(self, indices):
+        # 인덱스 배열(정렬 순서, 선택 위치)대로 토큰/bbox를 한 번에 재배치
+        indices = np.asarray(indices, dtype=np.intp)
+        doc = DocumentTokens.__new__(DocumentTokens)
+        doc.tokens = [self.tokens[i] for i in indices.tolist()]
+        doc.bboxes = self.bboxes[indices]
+        return doc
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __bool__(self):
+        return bool(self.tokens)
+
+    def __eq__(self, other):
+        if not isinstance(other, DocumentTokens):
+            return NotImplemented
+        return self.tokens == other.tokens and np.array_equal(self.bboxes, other.bboxes)
+
+    def __repr__(self):
+        return f"DocumentTokens({len(self)} tokens)"
+
+    def bbox_list(self):
+        return self.bboxes.tolist()
+
+    def to_dict(self):
+        return {"tokens": list(self.tokens), "bboxes": self.bbox_list()}
+
+    @property
+    def nbytes(self):
+        return self.bboxes.nbytes
@@ -0,0 +1,72 @@
+import numpy as np
+
+# --- 페이지 단위 벡터화 기하 연산 (NumPy) ---
+# OCR 결과의 boundingPoly.vertices를 한 번에 (N, 4) 배열로 모아 정규화하고
+# 전체 필드 × 전체 테이블 포함/겹침 여부를 브로드캐스팅으로 한 번에 계산
+# 좌표 의미는 common.normalize_bbox와 동일: int(v * 1000 / w) → 0 방향 버림, 좌상단/우하단 정렬
+
+def corner_points(items):
+    # 각 항목의 vertices[0], vertices[2] → [[x0, y0, x2, y2], ...] (원본 픽셀 좌표)
+    if not items:
+        return np.empty((0, 4), dtype=np.float64)
+    polys = [item['boundingPoly']['vertices'] for item in items]
+    return np.array([(v[0]['x'], v[0]['y'], v[2]['x'], v[2]['y']) for v in polys], dtype=np.float64)
+
+def normalize_points(points, img_w, img_h):
+    scaled = np.trunc(points * 1000 / np.array([img_w, img_h, img_w, img_h], dtype=np.float64))
+    boxes = np.empty(scaled.shape, dtype=np.int64)
+    boxes[:, 0] = np.minimum(scaled[:, 0], scaled[:, 2])
+    boxes[:, 1] = np.minimum(scaled[:, 1], scaled[:, 3])
+    boxes[:, 2] = np.maximum(scaled[:, 0], scaled[:, 2])
+    boxes[:, 3] = np.maximum(scaled[:, 1], scaled[:, 3])
+    return boxes
+
+def normalize_bboxes(items, img_w, img_h):
+    return normalize_points(corner_points(items), img_w, img_h)
+
+def as_boxes(bboxes):
+    return np.asarray(bboxes, dtype=np.int64).reshape(-1, 4)
+
+def inside_any(boxes, table_boxes):
+    # 박스가 어떤 테이블 영역에 완전히 포함되면 True (경계 포함)
+    boxes, table_boxes = as_boxes(boxes), as_boxes(table_boxes)
+    if len(table_boxes) == 0:
+        return np.zeros(len(boxes), dtype=bool)
+    b = boxes[:, None, :]
+    t = table_boxes[None, :, :]
+    inside = (b[..., 0] >= t[..., 0]) & (b[..., 1] >= t[..., 1]) & (b[..., 2] <= t[..., 2]) & (b[..., 3] <= t[..., 3])
+    return inside.any(axis=1)
+
+def overlaps_any(boxes, table_boxes):
+    # 박스가 어떤 테이블 영역과 조금이라도 겹치면(맞닿아도) True
+    boxes, table_boxes = as_boxes(boxes), as_boxes(table_boxes)
+    if len(table_boxes) == 0:
+        return np.zeros(len(boxes), dtype=bool)
+    b = boxes[:, None, :]
+    t = table_boxes[None, :, :]
+    apart = (b[..., 2] < t[..., 0]) | (b[..., 0] > t[..., 2]) | (b[..., 3] < t[..., 1]) | (b[..., 1] > t[..., 3])
+    return (~apart).any(axis=1)
+
+class PageGeometry:
+    # 한 페이지의 이미지 크기, 정규화된 필드/테이블/셀 박스를 한 번만 계산해 각 단계가 공유
+    def __init__(self, image_info):
+        self.img_w = image_info['convertedImageInfo']['width']
+        self.img_h = image_info['convertedImageInfo']['height']
+        tables = image_info.get('tables', [])
+        cells = [cell for table in tables for cell in table.get('cells', [])]
+        self.field_boxes = normalize_bboxes(image_info.get('fields', []), self.img_w, self.img_h)
+        self.table_boxes = normalize_bboxes(tables, self.img_w, self.img_h)
+        self.cell_boxes = normalize_bboxes(cells, self.img_w, self.img_h)
+        self._fields_in_table = None
+
+    @classmethod
+    def from_ocr(cls, ocr_data):
+        return cls(ocr_data['images'][0])
+
+    def fields_inside_tables(self):
+        if self._fields_in_table is None:
+            self._fields_in_table = inside_any(self.field_boxes, self.table_boxes)
+        return self._fields_in_table
+
+    def overlaps_tables(self, bboxes):
+        return overlaps_any(bboxes, self.table_boxes)
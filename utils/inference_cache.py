@@ -0,0 +1,104 @@
+import time
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from utils.config import env_bool, env_int, env_float
+
+# --- LayoutLM 추론 결과 캐시 ---
+# 같은 양식을 다시 제출하면(클라이언트 재시도, 수정 화면 등) OCR 결과가 같아 토큰/bbox도 같음
+# (문서 유형, 모델 버전, 추론 설정, 토큰, bbox) 해시를 키로 결과를 메모리 LRU에 보관
+# 모델 디렉토리 파일이 바뀌면 모델 버전이 달라지므로 해당 문서 유형의 결과를 모두 버림
+class InferenceResultCache:
+    def __init__(self, max_entries=256, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (저장 시각, 문서 유형, 결과)
+        self._versions = {}            # doctype -> 마지막으로 본 모델 버전
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def make_key(doctype, version, settings, doc):
+        # doc: DocumentTokens (bbox는 int32 배열 바이트를 그대로 해시)
+        digest = hashlib.sha256()
+        digest.update(json.dumps([doctype, version, settings], ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(doc.tokens, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(doc.bboxes.tobytes())
+        return digest.hexdigest()
+
+    def _expired(self, stored_at):
+        return self.ttl_seconds > 0 and time.monotonic() - stored_at > self.ttl_seconds
+
+    def check_version(self, doctype, version):
+        # 모델 버전이 바뀌었으면 True (해당 문서 유형 결과는 모두 제거)
+        with self._lock:
+            previous = self._versions.get(doctype)
+            self._versions[doctype] = version
+            if previous is None or previous == version:
+                return False
+            stale = [key for key, entry in self._entries.items() if entry[1] == doctype]
+            for key in stale:
+                del self._entries[key]
+            self.stats["invalidations"] += 1
+        print(f"[추론 캐시] 모델 변경 감지 → {doctype} 결과 {len(stale)}건 제거")
+        return True
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if self._expired(entry[0]):
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return _copy_result(entry[2])
+
+    def put(self, key, doctype, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), doctype, _copy_result(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            entries = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        })
+        return stats
+
+def _copy_result(result):
+    # 호출한 쪽에서 결과 리스트를 수정해도 캐시된 값은 그대로 유지
+    return {
+        "doctype": result["doctype"],
+        "tokens": list(result["tokens"]),
+        "bboxes": [list(bbox) for bbox in result["bboxes"]],
+        "labels": list(result["labels"]),
+    }
+
+inference_cache = InferenceResultCache(
+    max_entries=env_int("LAYOUTLM_RESULT_CACHE_MAX_ENTRIES", 256),
+    ttl_seconds=env_float("LAYOUTLM_RESULT_CACHE_TTL_SECONDS", 3600),
+) if env_bool("LAYOUTLM_RESULT_CACHE_ENABLED", True) else None
+
+def get_inference_cache_stats():
+    return inference_cache.snapshot() if inference_cache else None
@@ -0,0 +1,158 @@
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import torch
+from utils.config import env_str, env_int
+
+# --- 추론 전용 실행기 ---
+# 요청 스레드에서 바로 forward pass를 돌리지 않고 고정된 수의 추론 워커에 맡김
+# HTTP 동시성과 추론 병렬성을 따로 조절하고, 대기열이 가득 차면 기다리지 않고 바로 거절(503)
+# mode: "inline"(기본, 요청 스레드에서 실행) / "thread"(스레드 풀) / "process"(프로세스 풀)
+EXECUTOR_MODE = env_str("LAYOUTLM_EXECUTOR", "inline")
+EXECUTOR_WORKERS = env_int("LAYOUTLM_EXECUTOR_WORKERS", 1)
+EXECUTOR_QUEUE = env_int("LAYOUTLM_EXECUTOR_QUEUE", 16)
+
+# torch 스레드 수 (0이면 torch 기본값 = 모든 코어)
+# 한 호스트에 워커가 여러 개면 "코어 수 / 워커 수" 정도로 고정해야 서로 코어를 뺏지 않음
+INTRA_OP_THREADS = env_int("LAYOUTLM_TORCH_THREADS", 0)
+INTEROP_THREADS = env_int("LAYOUTLM_TORCH_INTEROP_THREADS", 0)
+
+# 워커마다 한 번씩 실행하는 작업(워밍업)이 다른 워커를 기다리는 최대 시간(초)
+WORKER_SYNC_TIMEOUT = env_int("LAYOUTLM_EXECUTOR_SYNC_TIMEOUT", 600)
+
+class InferenceOverloadedError(RuntimeError):
+    pass
+
+def configure_torch_threads(intra_op=INTRA_OP_THREADS, interop=INTEROP_THREADS):
+    if intra_op:
+        torch.set_num_threads(intra_op)
+    if interop:
+        try:
+            torch.set_num_interop_threads(interop)
+        except RuntimeError as e:
+            # inter-op 스레드 수는 병렬 작업이 한 번이라도 실행된 뒤에는 바꿀 수 없음
+            print(f"[경고] torch inter-op 스레드 수 설정 실패: {e}")
+
+# --- 프로세스 풀 워커 ---
+# 워커마다 한 번씩 작업을 실행할 때 쓰는 barrier (spawn 시 initializer 인자로 전달)
+_worker_barrier = None
+
+def _init_process_worker(intra_op, interop, barrier):
+    global _worker_barrier
+    _worker_barrier = barrier
+    configure_torch_threads(intra_op, interop)
+
+def _run_once_per_worker(fn, args, timeout):
+    # fn 실행 후 나머지 워커도 자기 몫을 받을 때까지 대기 → 한 워커가 두 번 받지 않음
+    try:
+        return fn(*args)
+    finally:
+        try:
+            _worker_barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            print("[경고] 다른 추론 워커를 기다리다 시간이 초과되었습니다.")
+
+class InferenceExecutor:
+    def __init__(self, mode="thread", max_workers=1, max_queue=16,
+                 intra_op_threads=INTRA_OP_THREADS, interop_threads=INTEROP_THREADS):
+        if mode not in {"thread", "process"}:
+            raise ValueError(f"지원하지 않는 추론 실행기입니다: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.intra_op_threads = intra_op_threads
+        self.interop_threads = interop_threads
+
+        if mode == "process":
+            # 자식 프로세스는 spawn으로 시작해 부모의 torch 스레드 풀 상태를 물려받지 않음
+            context = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=context,
+                initializer=_init_process_worker,
+                initargs=(intra_op_threads, interop_threads, context.Barrier(max_workers)),
+            )
+        else:
+            configure_torch_threads(intra_op_threads, interop_threads)
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="layoutlm-infer")
+
+        # 실행 중 + 대기 중인 작업 수 상한
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise InferenceOverloadedError("추론 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.")
+
+        with self._lock:
+            self.stats["submitted"] += 1
+            self.stats["in_flight"] += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+        try:
+            result = self._pool.submit(fn, *args).result()
+        except Exception:
+            with self._lock:
+                self.stats["failed"] += 1
+            raise
+        finally:
+            with self._lock:
+                self.stats["in_flight"] -= 1
+            self._slots.release()
+
+        with self._lock:
+            self.stats["completed"] += 1
+        return result
+
+    # 모든 워커에서 fn(*args)를 한 번씩 실행하고 워커별 결과 목록을 반환 (시작 시 워밍업용, 대기열 제한 없음)
+    # 프로세스 풀은 워커마다 모델 캐시가 따로라 워커마다 실행, 스레드 풀은 이 프로세스의 캐시를 같이 쓰므로 한 번만 실행
+    def run_on_each_worker(self, fn, *args, timeout=WORKER_SYNC_TIMEOUT):
+        if self.mode != "process":
+            return [fn(*args)]
+        # spawn 풀은 쉬는 워커가 없으면 submit마다 새 워커를 띄우므로 max_workers개가 모두 시작됨
+        futures = [self._pool.submit(_run_once_per_worker, fn, args, timeout) for _ in range(self.max_workers)]
+        return [future.result() for future in futures]
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update({
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "torch_threads": self.intra_op_threads or torch.get_num_threads(),
+            "torch_interop_threads": self.interop_threads or torch.get_num_interop_threads(),
+        })
+        return stats
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+_executor = None
+_executor_lock = threading.Lock()
+_threads_configured = False
+
+# LAYOUTLM_EXECUTOR가 thread/process일 때만 실행기 사용 (inline이면 None)
+def get_inference_executor():
+    global _executor, _threads_configured
+    if EXECUTOR_MODE == "inline":
+        if not _threads_configured:
+            with _executor_lock:
+                if not _threads_configured:
+                    configure_torch_threads()
+                    _threads_configured = True
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = InferenceExecutor(
+                    mode=EXECUTOR_MODE,
+                    max_workers=EXECUTOR_WORKERS,
+                    max_queue=EXECUTOR_QUEUE,
+                )
+    return _executor
+
+def get_inference_executor_stats():
+    return _executor.snapshot() if _executor else None
@@ -0,0 +1,102 @@
+import time
+import threading
+from collections import deque, Counter
+from concurrent.futures import Future
+from utils.config import env_bool, env_int, env_float
+
+# --- 요청 간 마이크로 배치 스케줄러 ---
+# 문서 유형별 큐에 추론 요청을 모았다가 max_batch_size개가 차거나
+# 첫 요청이 max_wait_ms만큼 기다리면 한 번의 패딩된 forward pass로 처리하고
+# 문서별 결과를 각 요청 스레드에 돌려줌
+class InferenceScheduler:
+    def __init__(self, run_batch, max_batch_size=8, max_wait_ms=10.0):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queues = {}   # doctype -> deque[(도착 시각, DocumentTokens, Future)]
+        self._workers = {}  # doctype -> Thread
+        self._cond = threading.Condition()
+        self._batch_sizes = Counter()
+        self._requests = 0
+
+    def submit(self, doctype, doc):
+        future = Future()
+        with self._cond:
+            self._queues.setdefault(doctype, deque()).append((time.monotonic(), doc, future))
+            self._requests += 1
+            if doctype not in self._workers:
+                worker = threading.Thread(
+                    target=self._worker_loop, args=(doctype,),
+                    name=f"layoutlm-batch-{doctype}", daemon=True
+                )
+                self._workers[doctype] = worker
+                worker.start()
+            self._cond.notify_all()
+        return future.result()
+
+    def _next_batch(self, doctype):
+        queue = self._queues[doctype]
+        with self._cond:
+            while True:
+                if queue:
+                    deadline = queue[0][0] + self.max_wait
+                    remaining = deadline - time.monotonic()
+                    if len(queue) >= self.max_batch_size or remaining <= 0:
+                        size = min(len(queue), self.max_batch_size)
+                        return [queue.popleft() for _ in range(size)]
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait()
+
+    def _worker_loop(self, doctype):
+        while True:
+            batch = self._next_batch(doctype)
+            with self._cond:
+                self._batch_sizes[len(batch)] += 1
+
+            futures = [item[2] for item in batch]
+            try:
+                results = self.run_batch(doctype, [item[1] for item in batch])
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def snapshot(self):
+        with self._cond:
+            sizes = dict(sorted(self._batch_sizes.items()))
+            queued = {doctype: len(queue) for doctype, queue in self._queues.items()}
+            requests = self._requests
+        batches = sum(sizes.values())
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "requests": requests,
+            "batches": batches,
+            "mean_batch_size": round(sum(k * v for k, v in sizes.items()) / batches, 3) if batches else 0.0,
+            "batch_size_histogram": sizes,
+            "queued": queued,
+        }
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+# LAYOUTLM_BATCHING=1일 때만 스케줄러 사용 (기본은 요청 스레드에서 바로 추론)
+def get_inference_scheduler(run_batch):
+    global _scheduler
+    if not env_bool("LAYOUTLM_BATCHING", False):
+        return None
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = InferenceScheduler(
+                    run_batch,
+                    max_batch_size=env_int("LAYOUTLM_MAX_BATCH_SIZE", 8),
+                    max_wait_ms=env_float("LAYOUTLM_MAX_WAIT_MS", 10.0),
+                )
+    return _scheduler
+
+def get_inference_scheduler_stats():
+    return _scheduler.snapshot() if _scheduler else None
@@ -0,0 +1,48 @@
+import os
+import json
+import threading
+from types import MappingProxyType
+from utils.common import LABEL_KEYWORDS_PATH
+
+# --- 라벨 키워드 인덱스 ---
+# label_keywords.json을 한 번만 읽어 문서 유형별 허용 필드(라벨 키워드) 집합을 frozenset으로 만들어 둠
+# 파일 수정 시각이 바뀌면 다음 조회 때 다시 읽음 (요청마다 파일을 열거나 dict를 수정하지 않음)
+class KeywordIndex:
+    def __init__(self, path):
+        self.path = path
+        self.mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, "r", encoding="utf-8") as f:
+            label_keywords = json.load(f)
+
+        common = label_keywords.get("common", {})
+        common_fields = set(common.get("field_keywords", {})) | set(common.get("group_keywords", {}))
+        self._allowed_fields = MappingProxyType({
+            doctype: frozenset(set(section["field_keywords"]) | set(section["group_keywords"]) | common_fields)
+            for doctype, section in label_keywords.items()
+            if doctype != "common"
+        })
+
+    def allowed_fields(self, doctype):
+        try:
+            return self._allowed_fields[doctype]
+        except KeyError:
+            raise ValueError(f"label_keywords.json에 '{doctype}' 항목이 없습니다.")
+
+    @property
+    def doctypes(self):
+        return tuple(self._allowed_fields)
+
+_indexes = {}
+_index_lock = threading.Lock()
+
+def get_keyword_index(path=LABEL_KEYWORDS_PATH):
+    index = _indexes.get(path)
+    if index is not None and index.mtime_ns == os.stat(path).st_mtime_ns:
+        return index
+    with _index_lock:
+        index = _indexes.get(path)
+        if index is None or index.mtime_ns != os.stat(path).st_mtime_ns:
+            index = KeywordIndex(path)
+            _indexes[path] = index
+            print(f"✅ 라벨 키워드 인덱스 로드 ({len(index.doctypes)}개 문서 유형)")
+    return index
@@ -1,60 +1,150 @@
-import os, json, torch
-from utils.preprocessing import preprocess
-from utils.common import detect_doc_type 
-from utils.model_loader import get_model_and_tokenizer
-from transformers import LayoutLMForTokenClassification, LayoutLMTokenizerFast
-
-def run_layoutlm_inference(tokens, bboxes):
-    if not tokens or not bboxes:
+import numpy as np
+import torch
+from utils.preprocessing import preprocess_batch, first_subtoken_positions
+from utils.common import detect_doc_type
+from functools import partial
+from utils.model_loader import (
+    get_model_and_tokenizer, get_label_map, model_version, discard_if_outdated, resolve_backend, ONNX_QUANTIZE
+)
+from utils.inference_cache import inference_cache
+from utils.inference_scheduler import get_inference_scheduler
+from utils.inference_executor import get_inference_executor
+from utils.config import env_bool, env_int
+
+# 512 토큰을 넘는 문서를 겹치는 윈도우로 나눠 전체 단어에 라벨을 붙이는 모드
+WINDOWED = env_bool("LAYOUTLM_WINDOWED", False)
+WINDOW_STRIDE = env_int("LAYOUTLM_WINDOW_STRIDE", 128)
+
+def run_layoutlm_inference(doc):
+    return run_layoutlm_inference_pages([doc])[0]
+
+# 여러 페이지를 한 문서로 추론: 문서 유형은 제목이 있는 페이지로 한 번만 정하고,
+# 캐시에 없는 페이지들을 한 배치로 묶어 forward pass 한 번에 처리 (빈 페이지는 빈 결과)
+def run_layoutlm_inference_pages(docs, doctype=None):
+    if not any(docs):
         raise ValueError("토큰 또는 바운딩박스가 비어 있습니다.")
-    
+
     # 문서 유형 자동 감지
-    doctype = detect_doc_type(tokens)
+    doctype = doctype or detect_pages_doc_type(docs)
     if not doctype:
         raise ValueError("문서 유형을 감지할 수 없습니다.")
-    
-    # 모델 및 토크나이저 불러오기
-    (model, tokenizer), model_path = get_model_and_tokenizer(doctype)
-    
-    with open(os.path.join(model_path, "label_map.json"), "r", encoding="utf-8") as f:
-        label2id = json.load(f)
-    id2label = {v: k for k, v in label2id.items()}
+
+    results = [_empty_result(doctype) if not doc else None for doc in docs]
+    # 모델 디렉토리 버전: 추론하는 프로세스(프로세스 풀 워커 포함)가 자기가 로드한 모델과 비교해 다르면 다시 로드
+    version = model_version(doctype)
+    if inference_cache is None:
+        keys = [None] * len(docs)
+    else:
+        # 모델 디렉토리가 바뀌었으면 이전 버전의 결과는 버림
+        inference_cache.check_version(doctype, version)
+
+        # 같은 토큰/bbox 입력이면 캐시된 라벨을 바로 반환
+        settings = [resolve_backend(doctype), ONNX_QUANTIZE, WINDOWED, WINDOW_STRIDE]
+        keys = [inference_cache.make_key(doctype, version, settings, doc) if doc else None for doc in docs]
+        for i, key in enumerate(keys):
+            if key is not None:
+                results[i] = inference_cache.get(key)
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    if len(pending) == 1:
+        inferred = [_infer(doctype, docs[pending[0]])]
+    elif pending:
+        inferred = submit_layoutlm_batch(doctype, [docs[i] for i in pending], version)
+    else:
+        inferred = []
+
+    for i, result in zip(pending, inferred):
+        results[i] = result
+        if keys[i] is not None:
+            inference_cache.put(keys[i], doctype, result)
+    return results
+
+def detect_pages_doc_type(docs):
+    for doc in docs:
+        doctype = detect_doc_type(doc.tokens)
+        if doctype:
+            return doctype
+    return None
+
+def _empty_result(doctype):
+    return {"doctype": doctype, "tokens": [], "bboxes": [], "labels": []}
+
+def _infer(doctype, doc):
+    # 배치 스케줄러가 켜져 있으면 다른 요청과 묶어서 한 번에 추론
+    scheduler = get_inference_scheduler(submit_layoutlm_batch)
+    if scheduler is not None:
+        return scheduler.submit(doctype, doc)
+    return submit_layoutlm_batch(doctype, [doc])[0]
+
+# 추론 실행기가 설정되어 있으면 전용 워커에서 실행 (대기열이 가득 차면 InferenceOverloadedError)
+# version: 요청 시점의 모델 디렉토리 버전 (없으면 여기서 확인, 배치 스케줄러 경로)
+def submit_layoutlm_batch(doctype, documents, version=None):
+    run_batch = partial(run_layoutlm_batch, version=version or model_version(doctype))
+    executor = get_inference_executor()
+    if executor is None:
+        return run_batch(doctype, documents)
+    return executor.run(run_batch, doctype, documents)
+
+# 같은 문서 유형의 여러 문서를 패딩된 한 번의 forward pass로 추론
+def run_layoutlm_batch(doctype, documents, backend=None, quantize=None, version=None):
+    # 이 프로세스에 로드된 모델이 요청 시점 버전과 다르면 버리고 새 가중치로 로드
+    if version is not None:
+        discard_if_outdated(doctype, version)
+
+    # 모델 및 토크나이저 불러오기 (backend 미지정 시 LAYOUTLM_BACKEND 설정을 따름)
+    (model, tokenizer), model_path = get_model_and_tokenizer(doctype, backend=backend, quantize=quantize)
+    id2label = get_label_map(model_path)
 
     # 전처리
-    encoding, word_ids, valid_token_indices = preprocess(tokens, bboxes, tokenizer)
+    encoding, word_index, sample_mapping = preprocess_batch(
+        documents, tokenizer,
+        stride=WINDOW_STRIDE if WINDOWED else None
+    )
 
+    # 모든 문서의 모든 윈도우를 한 번의 forward pass로 추론
     with torch.no_grad():
         inputs = {k: v for k, v in encoding.items() if k != "offset_mapping"}
         outputs = model(**inputs)
-        predictions = outputs.logits.argmax(-1).squeeze().tolist()
-    
-    # predictions가 tensor인 경우 squeeze()를 통해 리스트로 변환
-    if isinstance(predictions, torch.Tensor):
-        predictions = predictions.squeeze().tolist()
-    
+        predictions = outputs.logits.argmax(-1).numpy()
+
+    doc_indices, word_ids, label_ids = select_word_predictions(word_index, predictions, sample_mapping)
+    bounds = np.searchsorted(doc_indices, np.arange(len(documents) + 1))
+    return [
+        postprocess(doctype, doc, word_ids[bounds[i]:bounds[i + 1]], label_ids[bounds[i]:bounds[i + 1]], id2label)
+        for i, doc in enumerate(documents)
+    ]
+
+def select_word_predictions(word_index, predictions, sample_mapping):
     # 예측 라벨을 첫 번째 서브토큰에 대해서만 할당
     # 중요 로직. LayoutLM은 단어를 토큰별로 나누고 해당 서브토큰까지 인식할 수 있기 때문에
     # 이 + #력 + ##서 이런식임. 때문에 첫번째 서브토큰인 '이'+#력+##서 를 하나의 단어로 취급하고 뒤에
     # 두 개의 서브토큰은 무시하도록 함.
-    labels = []
-    tokens_cleaned = []
-    bboxes_cleaned = []
-    seen_word_ids = set()
-
-    for i, word_id in enumerate(word_ids):
-        if word_id is None or word_id in seen_word_ids:
-            continue
-        seen_word_ids.add(word_id)
-
-        if word_id < len(tokens) and word_id < len(bboxes):
-            label = id2label.get(predictions[i], "O")
-            labels.append(label)
-            tokens_cleaned.append(tokens[word_id])
-            bboxes_cleaned.append(bboxes[word_id])
+    # 윈도우가 여러 개면 단어가 윈도우 가장자리에서 가장 먼(문맥이 가장 많은) 윈도우의 예측을 사용.
+    # 동점이면 앞 윈도우를 사용하므로, 윈도우 경계에 걸친 단어도 첫 서브토큰이 있는 윈도우가 선택됨
+    # 배치 전체를 한 번에 처리: 반환값은 (문서 번호, 단어 번호) 순으로 정렬된 (문서 번호, 단어 번호, 라벨 id) 배열
+    rows, cols = first_subtoken_positions(word_index)
+    words = word_index[rows, cols]
+
+    valid = word_index >= 0
+    first = valid.argmax(axis=1)
+    last = valid.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    context = np.minimum(cols - first[rows], last[rows] - cols)
+
+    docs = sample_mapping[rows]
+    order = np.lexsort((rows, -context, words, docs))
+    docs, words = docs[order], words[order]
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = (docs[1:] != docs[:-1]) | (words[1:] != words[:-1])
+    chosen = order[keep]
+    return docs[keep], words[keep], predictions[rows[chosen], cols[chosen]]
 
+def postprocess(doctype, doc, word_ids, label_ids, id2label):
+    # word_ids: 오름차순 단어 번호, label_ids: 단어별 예측 라벨 id
+    keep = word_ids < len(doc)
+    word_ids, label_ids = word_ids[keep], label_ids[keep]
     return {
         "doctype": doctype,
-        "tokens": tokens_cleaned,
-        "bboxes": bboxes_cleaned,
-        "labels": labels
+        "tokens": [doc.tokens[word_id] for word_id in word_ids.tolist()],
+        "bboxes": doc.bboxes[word_ids].tolist(),
+        "labels": [id2label.get(label_id, "O") for label_id in label_ids.tolist()]
     }
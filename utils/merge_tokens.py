@@ -1,33 +1,18 @@
-import json
-from utils.common import group_lines_by_y, save_json
+import numpy as np
+from utils.document_tokens import DocumentTokens
+from utils.common import line_refs
 
 def run_merge_tokens(
-    table_path: str = '../data/ocr_tokens_from_table.json',
-    text_path: str = '../data/ocr_tokens_from_text.json',
-    output_path: str = '../data/ocr_tokens.json',
+    table_doc: DocumentTokens,
+    text_doc: DocumentTokens,
     row_tol: int = 5
 ):
-    # --- 데이터 불러오기 ---
-    with open(table_path, 'r', encoding='utf-8') as f:
-        table_data = json.load(f)
+    doc = DocumentTokens.concat(table_doc, text_doc)
 
-    with open(text_path, 'r', encoding='utf-8') as f:
-        text_data = json.load(f)
+    # --- y1 정규화 후 정렬 (줄 기준 y → x0 순, 같으면 입력 순서 유지) ---
+    refs = line_refs(doc.bboxes[:, 1], tolerance=row_tol)
+    order = np.lexsort((doc.bboxes[:, 0], refs))
+    doc = doc.take(order)
 
-    tokens = table_data['tokens'] + text_data['tokens']
-    bboxes = table_data['bboxes'] + text_data['bboxes']
-
-    # --- y1 정규화 후 정렬 ---
-    tokens_with_boxes = list(zip(tokens, bboxes))
-    norm_y_map = group_lines_by_y([bbox for _, bbox in tokens_with_boxes], tolerance=row_tol)
-    tokens_with_boxes.sort(key=lambda x: (norm_y_map[x[1][1]], x[1][0]))
-
-    tokens, bboxes = zip(*tokens_with_boxes)
-    merged_data = {
-        "tokens": list(tokens),
-        "bboxes": list(bboxes)
-    }
-
-    save_json(output_path, merged_data)
-    print(f"✅ 병합 및 정렬 완료 → {output_path}")
-    return list(tokens), list(bboxes)
+    print(f"✅ 병합 및 정렬 완료 ({len(doc)}개)")
+    return doc
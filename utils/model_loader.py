@@ -1,21 +1,282 @@
-from transformers import LayoutLMForTokenClassification, LayoutLMTokenizerFast
+from transformers import LayoutLMConfig, LayoutLMForTokenClassification, LayoutLMTokenizerFast
 import os
+import json
+import importlib.util
+import hashlib
+import mmap
+import struct
+import warnings
+import threading
+import torch
+from collections import OrderedDict
+from utils.config import env_str, env_bool, env_int, env_list
+from utils.inference_executor import INTRA_OP_THREADS
 
-# 모델 캐싱
-model_cache = {}
+# 추론 백엔드: "torch"(기본) 또는 "onnx"
+# LAYOUTLM_ONNX_DOCTYPES로 문서 유형별로 ONNX 전환 가능 (예: resume,certificate)
+BACKEND = env_str("LAYOUTLM_BACKEND", "torch")
+ONNX_DOCTYPES = set(env_list("LAYOUTLM_ONNX_DOCTYPES"))
+ONNX_QUANTIZE = env_bool("LAYOUTLM_ONNX_QUANTIZE", False)
+# ONNX 파일은 python -m utils.onnx_backend로 미리 내보내고 요청 처리 중에는 읽기만 함
+# 1이면 파일이 없거나 가중치보다 오래됐을 때 그 자리에서 내보냄 (개발용, 모델 디렉토리에 쓰기 권한 필요)
+ONNX_AUTO_EXPORT = env_bool("LAYOUTLM_ONNX_AUTO_EXPORT", False)
+# ONNX 백엔드를 설정했는데 onnxruntime이 없으면 첫 요청이 아니라 시작할 때 설정 오류로 알림
+if (BACKEND == "onnx" or ONNX_DOCTYPES) and importlib.util.find_spec("onnxruntime") is None:
+    raise ImportError("ONNX 백엔드가 설정되었지만 onnxruntime이 설치되지 않았습니다: pip install -r requirements-onnx.txt")
+
+# 가중치 로드 방식: "copy"(기본, 프로세스마다 개별 복사본) 또는
+# "mmap"(safetensors를 읽기 전용으로 메모리 매핑 → 같은 호스트의 워커들이 OS 페이지 캐시 한 벌을 공유)
+LOAD_MODE = env_str("MODEL_LOAD_MODE", "copy")
+
+def resolve_backend(doctype, backend=None):
+    if backend:
+        return backend
+    return "onnx" if doctype in ONNX_DOCTYPES else BACKEND
+
+def load_torch_model(model_path):
+    if LOAD_MODE == "mmap":
+        return load_torch_model_mmap(model_path)
+    model = LayoutLMForTokenClassification.from_pretrained(
+        model_path,
+        use_safetensors=True
+    )
+    model.eval()
+    return model
+
+# --- safetensors 읽기 전용 메모리 매핑 ---
+_SAFETENSORS_DTYPES = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8,
+    "U8": torch.uint8, "BOOL": torch.bool,
+}
+
+def mmap_safetensors(path):
+    # 파일 형식: [헤더 길이(u64 LE)][JSON 헤더][텐서 데이터]
+    # 각 텐서는 복사 없이 매핑된 페이지를 그대로 가리킴 (쓰기 금지)
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header_len = struct.unpack("<Q", mapped[:8])[0]
+    header = json.loads(mapped[8:8 + header_len])
+    data_start = 8 + header_len
+
+    tensors = {}
+    with warnings.catch_warnings():
+        # 읽기 전용 버퍼 경고 무시 (추론 중에는 가중치에 쓰지 않음)
+        warnings.simplefilter("ignore", UserWarning)
+        for name, info in header.items():
+            if name == "__metadata__":
+                continue
+            dtype = _SAFETENSORS_DTYPES[info["dtype"]]
+            start, end = info["data_offsets"]
+            count = (end - start) // dtype.itemsize
+            if count == 0:
+                tensors[name] = torch.empty(info["shape"], dtype=dtype)
+                continue
+            tensor = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + start)
+            tensors[name] = tensor.reshape(info["shape"])
+    return tensors
+
+def load_torch_model_mmap(model_path):
+    config = LayoutLMConfig.from_pretrained(model_path)
+    # 파라미터 메모리를 할당하지 않도록 meta 디바이스에서 모델 구조만 생성
+    with torch.device("meta"):
+        model = LayoutLMForTokenClassification(config)
+
+    state_dict = mmap_safetensors(os.path.join(model_path, "model.safetensors"))
+    model.load_state_dict(state_dict, strict=False, assign=True)
+
+    # 체크포인트에 저장되지 않는 버퍼(position_ids 등)만 실제 값으로 생성
+    for module in model.modules():
+        for name, buffer in list(module._buffers.items()):
+            if buffer is None or not buffer.is_meta:
+                continue
+            if name.endswith("position_ids"):
+                value = torch.arange(buffer.shape[-1], dtype=buffer.dtype).expand(buffer.shape)
+            else:
+                value = torch.zeros(buffer.shape, dtype=buffer.dtype)
+            module._buffers[name] = value
+
+    missing = [name for name, param in model.named_parameters() if param.is_meta]
+    if missing:
+        raise ValueError(f"safetensors에 없는 가중치가 있습니다: {', '.join(missing[:5])}")
+    model.eval()
+    return model
+
+def load_label_map(model_path):
+    with open(os.path.join(model_path, "label_map.json"), "r", encoding="utf-8") as f:
+        label2id = json.load(f)
+    return {v: k for k, v in label2id.items()}
+
+def estimate_model_bytes(model):
+    # PyTorch: 파라미터+버퍼 크기, ONNX: 모델 파일 크기
+    if hasattr(model, "parameters"):
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    path = getattr(model, "path", None)
+    return os.path.getsize(path) if path and os.path.exists(path) else 0
+
+# --- 모델 캐시 (메모리 예산 기반 LRU) ---
+# max_models / max_bytes를 넘으면 가장 오래 사용하지 않은 문서 유형 모델부터 제거 (0이면 제한 없음)
+# 같은 키를 동시에 처음 요청해도 모델은 한 번만 로드 (키별 로드 락)
+class ModelCache:
+    def __init__(self, max_models=0, max_bytes=0):
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, bytes)
+        self._load_locks = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[0]
+
+    def get_or_load(self, key, load, sizeof=lambda value: 0):
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                return value
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not None:
+                    return value
+
+            value = load()
+            nbytes = sizeof(value)
+            with self._lock:
+                self._entries[key] = (value, nbytes)
+                self.stats["loads"] += 1
+                self._evict(keep=key)
+                self._load_locks.pop(key, None)
+            return value
+
+    def _used_bytes(self):
+        return sum(nbytes for _, nbytes in self._entries.values())
+
+    def _over_budget(self):
+        if self.max_models and len(self._entries) > self.max_models:
+            return True
+        return bool(self.max_bytes) and self._used_bytes() > self.max_bytes
+
+    def _evict(self, keep):
+        # 방금 로드한 모델은 예산을 넘더라도 남김 (요청 처리에 필요)
+        while self._over_budget():
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                break
+            del self._entries[victim]
+            self.stats["evictions"] += 1
+            print(f"[모델 캐시] 제거: {victim}")
+
+    def discard(self, match):
+        # match(key)가 참인 모델을 캐시에서 제거 (다음 요청 때 다시 로드)
+        with self._lock:
+            victims = [key for key in self._entries if match(key)]
+            for key in victims:
+                del self._entries[key]
+        return len(victims)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self):
+        with self._lock:
+            resident = [
+                {"key": "/".join(str(part) for part in key), "mb": round(nbytes / 2**20, 1)}
+                for key, (_, nbytes) in self._entries.items()
+            ]
+            stats = dict(self.stats)
+            used = self._used_bytes()
+        stats.update({
+            "resident": resident,  # 오래된 것 → 최근 사용 순
+            "used_mb": round(used / 2**20, 1),
+            "max_models": self.max_models,
+            "max_mb": round(self.max_bytes / 2**20, 1),
+        })
+        return stats
+
+# 모델 캐싱 (문서 유형, 백엔드)별, 라벨 맵(id2label)은 모델 경로별로 함께 캐싱
+model_cache = ModelCache(
+    max_models=env_int("MODEL_CACHE_MAX_MODELS", 0),
+    max_bytes=env_int("MODEL_CACHE_MAX_MB", 0) * 2**20,
+)
+label_map_cache = {}
+loaded_versions = {}  # 캐시 키 -> 이 프로세스가 로드한 모델 디렉토리 버전
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-def get_model_and_tokenizer(doctype, base_path=os.path.join(BASE_DIR, "model")):
+MODEL_DIR = os.path.join(BASE_DIR, "model")
+def get_model_and_tokenizer(doctype, base_path=MODEL_DIR, backend=None, quantize=None):
     model_path = os.path.join(base_path, doctype)
     if not os.path.exists(model_path):
         raise ValueError(f"모델 경로가 존재하지 않습니다: {model_path}")
 
-    if doctype not in model_cache:
-        model = LayoutLMForTokenClassification.from_pretrained(
-            model_path,
-            use_safetensors=True
-        )
+    backend = resolve_backend(doctype, backend)
+    if backend not in {"torch", "onnx"}:
+        raise ValueError(f"지원하지 않는 추론 백엔드입니다: {backend}")
+    quantize = ONNX_QUANTIZE if quantize is None else quantize
+    cache_key = (doctype, backend, quantize if backend == "onnx" else False)
+
+    def load():
+        # 로드하기 전에 버전을 기록 (로드 중에 파일이 바뀌면 다음 요청에서 버전이 달라 다시 로드)
+        loaded_versions[cache_key] = model_version(doctype, base_path)
+        if backend == "onnx":
+            from utils.onnx_backend import load_onnx_model
+            # PyTorch 모델은 ONNX 파일을 (다시) 내보내야 할 때만 로드
+            model = load_onnx_model(
+                lambda: load_torch_model(model_path), model_path,
+                quantize=quantize, num_threads=INTRA_OP_THREADS or None, auto_export=ONNX_AUTO_EXPORT
+            )
+        else:
+            model = load_torch_model(model_path)
         tokenizer = LayoutLMTokenizerFast.from_pretrained(model_path)
-        model.eval()
-        model_cache[doctype] = (model, tokenizer)
+        label_map_cache[model_path] = load_label_map(model_path)
+        return model, tokenizer
+
+    bundle = model_cache.get_or_load(cache_key, load, sizeof=lambda value: estimate_model_bytes(value[0]))
+    return bundle, model_path
+
+# 모델 디렉토리 최상위 파일들의 (이름, 크기, 수정 시각)으로 만든 버전 (onnx/ 등 파생 파일은 제외)
+def model_version(doctype, base_path=MODEL_DIR):
+    model_path = os.path.join(base_path, doctype)
+    try:
+        entries = sorted(
+            (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+            for entry in os.scandir(model_path) if entry.is_file()
+        )
+    except OSError:
+        return None
+    return hashlib.sha1(repr(entries).encode("utf-8")).hexdigest()[:16]
+
+def invalidate_model(doctype, base_path=MODEL_DIR):
+    label_map_cache.pop(os.path.join(base_path, doctype), None)
+    for key in [key for key in list(loaded_versions) if key[0] == doctype]:
+        loaded_versions.pop(key, None)
+    return model_cache.discard(lambda key: key[0] == doctype)
+
+# 이 프로세스에 로드된 모델이 version(요청을 받은 프로세스가 본 버전)과 다르면 버림
+# 프로세스 풀 워커처럼 부모와 모델 캐시를 공유하지 않는 곳에서도 다음 로드 때 새 가중치를 읽게 함
+def discard_if_outdated(doctype, version, base_path=MODEL_DIR):
+    if not any(key[0] == doctype and loaded != version for key, loaded in list(loaded_versions.items())):
+        return False
+    invalidate_model(doctype, base_path)
+    print(f"✅ 모델 버전 변경 감지 → 다시 로드: {doctype}")
+    return True
+
+def get_model_cache_stats():
+    return model_cache.snapshot()
 
-    return model_cache[doctype], model_path
\ No newline at end of file
+def get_label_map(model_path):
+    if model_path not in label_map_cache:
+        label_map_cache[model_path] = load_label_map(model_path)
+    return label_map_cache[model_path]
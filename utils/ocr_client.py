@@ -0,0 +1,301 @@
+import re
+import json
+import time
+import uuid
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUS = {500, 502, 503, 504}
+BODY_CHUNK_SIZE = 64 * 1024
+
+# JSON 문자열 안에 그대로 넣어도 되는 base64 문자만 포함하는지 확인
+_JSON_SAFE_BASE64 = re.compile(r"[A-Za-z0-9+/=_-]*")
+
+# --- 요청 본문 스트리밍 직렬화 ---
+# 수 MB짜리 base64를 json.dumps로 새 문자열에 복사하지 않고
+# 앞/뒤 JSON 조각 + 이미지 데이터를 청크 단위로 흘려보냄
+# __len__이 있어 requests가 Content-Length를 설정하고, 재시도 시 다시 순회 가능
+class OcrRequestBody:
+    def __init__(self, payload: dict, images: list):
+        # images를 제외한 나머지 필드를 먼저 직렬화하고 images 배열을 마지막에 이어 붙임
+        head = {k: v for k, v in payload.items() if k != "images"}
+        head_json = json.dumps(head, ensure_ascii=False)
+        opening = head_json[:-1] + (", " if head else "") + '"images": ['
+        self._parts = [opening.encode("utf-8")]
+
+        for idx, image in enumerate(images):
+            meta = {k: v for k, v in image.items() if k != "data"}
+            meta_json = json.dumps(meta, ensure_ascii=False)
+            prefix = ("," if idx else "") + meta_json[:-1] + (', ' if meta else '') + '"data": "'
+            self._parts.append(prefix.encode("utf-8"))
+            self._parts.append(_encode_json_string_body(image["data"]))
+            self._parts.append(b'"}')
+
+        self._parts.append(b"]}")
+        self._length = sum(len(part) for part in self._parts)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for part in self._parts:
+            view = memoryview(part)
+            for start in range(0, len(view), BODY_CHUNK_SIZE):
+                yield view[start:start + BODY_CHUNK_SIZE]
+
+def _encode_json_string_body(data: str) -> bytes:
+    if _JSON_SAFE_BASE64.fullmatch(data):
+        return data.encode("ascii")
+    # 줄바꿈 등 이스케이프가 필요한 문자가 섞인 경우에만 json으로 처리
+    return json.dumps(data)[1:-1].encode("ascii")
+
+# --- 재시도/헤지 예산 ---
+# 요청마다 ratio만큼 토큰을 적립하고 추가 전송(재시도, 헤지) 1회에 토큰 1개를 사용
+# 장기적으로 추가 전송 비율이 ratio를 넘지 않아 업스트림 트래픽/비용이 몇 배로 불어나지 않음
+class RequestBudget:
+    def __init__(self, ratio=0.2, min_tokens=3.0, max_tokens=20.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self):
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+# --- Clova OCR 클라이언트 ---
+# Session + 커넥션 풀로 keep-alive 재사용, connect/read 타임아웃,
+# 5xx/연결 오류에 대해 지터가 있는 지수 백오프로 제한된 횟수만큼 재시도
+# hedge=True이면 최근 지연시간의 백분위수 안에 응답이 없을 때 같은 요청을 한 번 더 보내고
+# 먼저 도착한 응답을 사용 (헤지 비율은 hedge_max_rate로 제한)
+# 헤지 타이머는 첫 요청이 풀에서 실제로 시작된 시점부터 재고, 헤지는 별도의 작은 풀(hedge_pool_size)에서만 보냄
+# (로컬 풀 대기 때문에 헤지가 나가거나 헤지가 첫 요청과 같은 풀 자리를 두고 경쟁하지 않도록)
+class ClovaOcrClient:
+    def __init__(
+        self,
+        url: str,
+        secret_key: str,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 4.0,
+        pool_size: int = 10,
+        retry_budget: RequestBudget = None,
+        session: requests.Session = None,
+        hedge: bool = False,
+        hedge_percentile: float = 0.9,
+        hedge_max_rate: float = 0.1,
+        hedge_min_samples: int = 20,
+        hedge_pool_size: int = None,
+        latency_window: int = 200,
+    ):
+        if not url or not secret_key:
+            raise EnvironmentError("Clova OCR URL 또는 시크릿 키가 설정되지 않았습니다.")
+        self.url = url
+        self.secret_key = secret_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget or RequestBudget()
+
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_budget = RequestBudget(ratio=hedge_max_rate, min_tokens=1.0, max_tokens=5.0)
+        # 헤지 기준은 헤지 없이 끝난 첫 요청(primary)의 업스트림 지연시간으로만 계산
+        self._latencies = deque(maxlen=latency_window)
+        # 호출 측이 실제로 기다린 시간 (헤지 효과 확인용 p50/p99)
+        self._response_latencies = deque(maxlen=latency_window)
+        hedge_pool_size = (hedge_pool_size or max(1, pool_size // 4)) if hedge else 0
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="ocr-primary") if hedge else None
+        self._hedge_executor = ThreadPoolExecutor(max_workers=hedge_pool_size, thread_name_prefix="ocr-hedge") if hedge else None
+        # 헤지 풀의 빈 자리 수 (자리가 없으면 헤지 요청을 대기열에 넣지 않고 건너뜀)
+        self._hedge_slots = threading.BoundedSemaphore(hedge_pool_size) if hedge else None
+
+        self.session = session or requests.Session()
+        # 첫 요청과 헤지가 동시에 커넥션을 잡아도 keep-alive 커넥션을 버리지 않도록 헤지 풀 크기만큼 여유를 둠
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size + hedge_pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "attempts": 0,
+            "retries": 0,
+            "failures": 0,
+            "hedges_fired": 0,
+            "hedges_won": 0,
+            "hedges_skipped_budget": 0,
+            "hedges_skipped_busy": 0,
+        }
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def build_body(self, images: list) -> OcrRequestBody:
+        payload = {
+            "version": "V2",
+            "requestId": str(uuid.uuid4()),
+            "timestamp": int(time.time() * 1000),
+            "lang": "ko",
+            "enableTableDetection": True
+        }
+        return OcrRequestBody(payload, images)
+
+    def recognize(self, base64_string: str, file_ext: str = "jpg") -> dict:
+        images = [{"format": file_ext, "name": f"doc.{file_ext}", "data": base64_string}]
+        return self.send(self.build_body(images))
+
+    def recognize_pages(self, pages: list) -> dict:
+        # 여러 페이지를 한 번의 요청으로 전송, 응답 images[i]가 i번째 페이지
+        images = [
+            {"format": file_ext, "name": f"page{idx + 1}.{file_ext}", "data": base64_string}
+            for idx, (base64_string, file_ext) in enumerate(pages)
+        ]
+        return self.send(self.build_body(images))
+
+    def send(self, body: OcrRequestBody) -> dict:
+        self._count("requests")
+        self.retry_budget.deposit()
+        self.hedge_budget.deposit()
+
+        started = time.perf_counter()
+        delay = self.hedge_delay() if self.hedge else None
+        if delay is None:
+            result = self._timed_send(body)
+        else:
+            result = self._send_hedged(body, delay)
+        with self._lock:
+            self._response_latencies.append(time.perf_counter() - started)
+        return result
+
+    def _send_hedged(self, body: OcrRequestBody, delay: float) -> dict:
+        started = threading.Event()
+        hedge_sent = threading.Event()
+
+        def send_primary():
+            started.set()
+            return self._timed_send(body, record=lambda: not hedge_sent.is_set())
+
+        primary = self._executor.submit(send_primary)
+        # 풀에서 기다린 시간은 빼고, 첫 요청이 전송을 시작한 뒤 delay 안에 응답이 없을 때만 헤지
+        started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        if not self._hedge_slots.acquire(blocking=False):
+            self._count("hedges_skipped_busy")
+            return primary.result()
+        if not self.hedge_budget.try_withdraw():
+            self._hedge_slots.release()
+            self._count("hedges_skipped_budget")
+            return primary.result()
+
+        def send_hedge():
+            try:
+                return self._send_with_retries(body)
+            finally:
+                self._hedge_slots.release()
+
+        # 첫 요청이 지연 기준을 넘김 → 동일한 요청을 한 번 더 보내고 먼저 성공한 응답 사용
+        hedge_sent.set()
+        self._count("hedges_fired")
+        hedged = self._hedge_executor.submit(send_hedge)
+        pending = {primary, hedged}
+        failure = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedged:
+                        self._count("hedges_won")
+                    return future.result()
+                failure = future.exception()
+        raise failure
+
+    def hedge_delay(self):
+        # 헤지 없이 끝난 최근 첫 요청 지연시간의 hedge_percentile 백분위수 (표본이 부족하면 헤지하지 않음)
+        # 헤지가 붙은 요청을 빼므로 기준이 느린 꼬리 안으로 올라가지 않음, 헤지 비율은 hedge_budget이 제한
+        # (예산이 떨어져 헤지 없이 끝난 느린 요청은 기록되므로 헤지가 막히면 기준이 다시 올라감)
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[int(self.hedge_percentile * (len(ordered) - 1))]
+
+    def _timed_send(self, body: OcrRequestBody, record=None) -> dict:
+        # record: 끝난 뒤 지연시간을 헤지 기준 표본으로 남길지 (None이면 항상)
+        started = time.perf_counter()
+        result = self._send_with_retries(body)
+        if record is None or record():
+            with self._lock:
+                self._latencies.append(time.perf_counter() - started)
+        return result
+
+    def _send_with_retries(self, body: OcrRequestBody) -> dict:
+        headers = {
+            "Content-Type": "application/json",
+            "X-OCR-SECRET": self.secret_key
+        }
+
+        attempt = 0
+        while True:
+            self._count("attempts")
+            try:
+                response = self.session.post(self.url, headers=headers, data=body, timeout=self.timeout)
+                if response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    return response.json()
+                failure = requests.HTTPError(
+                    f"Clova OCR 서버 오류: {response.status_code}", response=response
+                )
+            except requests.ConnectionError as e:
+                failure = e
+
+            if attempt >= self.max_retries or not self.retry_budget.try_withdraw():
+                self._count("failures")
+                raise failure
+            attempt += 1
+            self._count("retries")
+            time.sleep(self._backoff(attempt))
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: 0 ~ min(max, base * 2^(attempt-1)) 사이 임의 대기
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            ordered = sorted(self._response_latencies)
+        if ordered:
+            stats["latency_p50_ms"] = round(ordered[int(0.5 * (len(ordered) - 1))] * 1000, 1)
+            stats["latency_p99_ms"] = round(ordered[int(0.99 * (len(ordered) - 1))] * 1000, 1)
+        if self.hedge:
+            delay = self.hedge_delay()
+            stats["hedge_delay_ms"] = round(delay * 1000, 1) if delay is not None else None
+            fired = stats["hedges_fired"]
+            stats["hedge_rate"] = round(fired / stats["requests"], 4) if stats["requests"] else 0.0
+            stats["hedge_win_rate"] = round(stats["hedges_won"] / fired, 4) if fired else 0.0
+        return stats
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._hedge_executor.shutdown(wait=False)
+        self.session.close()
@@ -2,51 +2,285 @@ import os
 import uuid
 import time
 import json
-import requests
-from dotenv import load_dotenv
-from utils.common import save_json
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from utils.config import env_str, env_bool, env_int, env_float
+from utils.ocr_client import ClovaOcrClient
 
-# --- 환경 변수 로드 ---
-load_dotenv()
-secret_key = os.getenv("CLOVA_OCR_SECRET")
-url = os.getenv("CLOVA_OCR_URL")
+SUPPORTED_EXTS = {"jpg", "jpeg", "png"}
 
-if not secret_key or not url:
-    raise EnvironmentError(".env에서 CLOVA_OCR_SECRET 또는 CLOVA_OCR_URL을 불러오지 못했습니다.")
+# --- OCR 클라이언트 (프로세스당 하나, 커넥션 풀 재사용) ---
+# 테스트 등에서는 set_ocr_client()로 다른 서버를 가리키는 클라이언트를 주입
+_ocr_client = None
+_ocr_client_lock = threading.Lock()
 
-# --- OCR 호출 및 결과 파일 저장 ---
-def call_clova_ocr(base64_string: str, file_ext: str = "jpg") -> str:
+def get_ocr_client() -> ClovaOcrClient:
+    global _ocr_client
+    if _ocr_client is None:
+        with _ocr_client_lock:
+            if _ocr_client is None:
+                secret_key = env_str("CLOVA_OCR_SECRET")
+                url = env_str("CLOVA_OCR_URL")
+                if not secret_key or not url:
+                    raise EnvironmentError(".env에서 CLOVA_OCR_SECRET 또는 CLOVA_OCR_URL을 불러오지 못했습니다.")
+                _ocr_client = ClovaOcrClient(
+                    url,
+                    secret_key,
+                    connect_timeout=env_float("CLOVA_OCR_CONNECT_TIMEOUT", 3.05),
+                    read_timeout=env_float("CLOVA_OCR_READ_TIMEOUT", 30.0),
+                    max_retries=env_int("CLOVA_OCR_MAX_RETRIES", 2),
+                    pool_size=env_int("CLOVA_OCR_POOL_SIZE", 10),
+                    hedge=env_bool("CLOVA_OCR_HEDGE", False),
+                    hedge_percentile=env_float("CLOVA_OCR_HEDGE_PERCENTILE", 0.9),
+                    hedge_max_rate=env_float("CLOVA_OCR_HEDGE_MAX_RATE", 0.1),
+                    hedge_pool_size=env_int("CLOVA_OCR_HEDGE_POOL_SIZE", 0) or None,
+                )
+    return _ocr_client
+
+def set_ocr_client(client: ClovaOcrClient):
+    global _ocr_client
+    with _ocr_client_lock:
+        _ocr_client = client
+
+# --- OCR 결과 캐시 ---
+# 디코딩된 이미지 바이트 + 확장자의 해시를 키로 사용
+# 1단계: 메모리 LRU, 2단계: (선택) 디스크 캐시, 둘 다 TTL 적용
+# 같은 이미지에 대한 동시 요청은 진행 중인 OCR 호출 하나를 공유 (single-flight)
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class OcrResultCache:
+    def __init__(self, max_entries=128, disk_dir=None, ttl_seconds=86400):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()  # key -> (저장 시각, 결과)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "shared_inflight": 0,
+            "misses": 0,
+            "errors": 0,
+            "evictions": 0,
+        }
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(base64_string: str, file_ext: str) -> str:
+        image_bytes = base64.b64decode(base64_string)
+        digest = hashlib.sha256(image_bytes)
+        digest.update(b"\0" + file_ext.lower().encode("utf-8"))
+        return digest.hexdigest()
+
+    def _expired(self, stored_at):
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    # --- 메모리 계층 (lock 안에서 호출) ---
+    def _memory_get(self, key):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if self._expired(stored_at):
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return result
+
+    def _memory_put(self, key, result, stored_at=None):
+        self._memory[key] = (stored_at or time.time(), result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    # --- 디스크 계층 ---
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None, None
+        path = self._disk_path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if self._expired(stored_at):
+                os.remove(path)
+                return None, None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f), stored_at
+        except (OSError, ValueError):
+            return None, None
+
+    def _disk_put(self, key, result):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._disk_writes += 1
+            sweep = self._disk_writes % 100 == 0
+        if sweep:
+            self.evict_expired_from_disk()
+
+    def evict_expired_from_disk(self):
+        if not self.disk_dir or self.ttl_seconds <= 0:
+            return 0
+        removed = 0
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if self._expired(os.path.getmtime(path)):
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    def get_or_fetch(self, key, fetch):
+        with self._lock:
+            result = self._memory_get(key)
+            if result is not None:
+                self.stats["memory_hits"] += 1
+                return result
+
+            inflight = self._inflight.get(key)
+            is_owner = inflight is None
+            if is_owner:
+                inflight = _InFlight()
+                self._inflight[key] = inflight
+            else:
+                self.stats["shared_inflight"] += 1
+
+        if not is_owner:
+            # 다른 요청이 같은 이미지를 OCR 중 → 그 결과를 기다림
+            inflight.event.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return inflight.result
+
+        try:
+            result, stored_at = self._disk_get(key)
+            if result is not None:
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                    self._memory_put(key, result, stored_at)
+            else:
+                with self._lock:
+                    self.stats["misses"] += 1
+                result = fetch()
+                self._disk_put(key, result)
+                with self._lock:
+                    self._memory_put(key, result)
+            inflight.result = result
+            return result
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            inflight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.event.set()
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["inflight"] = len(self._inflight)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["shared_inflight"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+ocr_cache = OcrResultCache(
+    max_entries=env_int("OCR_CACHE_MAX_ENTRIES", 128),
+    disk_dir=env_str("OCR_CACHE_DIR"),
+    ttl_seconds=env_float("OCR_CACHE_TTL_SECONDS", 86400),
+) if env_bool("OCR_CACHE_ENABLED", True) else None
+
+def get_ocr_cache_stats():
+    return ocr_cache.snapshot() if ocr_cache else None
+
+def get_ocr_client_stats():
+    return _ocr_client.snapshot() if _ocr_client else None
+
+# --- OCR 호출 (파싱된 결과 반환) ---
+# 반환된 결과는 캐시와 공유되므로 호출 측에서 수정하지 않아야 함
+def call_clova_ocr(base64_string: str, file_ext: str = "jpg") -> dict:
     if not base64_string:
         raise ValueError("이미지 데이터가 비어 있습니다.")
-    if file_ext.lower() not in {"jpg", "jpeg", "png"}:
+    if file_ext.lower() not in SUPPORTED_EXTS:
         raise ValueError(f"지원하지 않는 확장자입니다: {file_ext}")
 
-    payload = {
-        "version": "V2",
-        "requestId": str(uuid.uuid4()),
-        "timestamp": int(time.time() * 1000),
-        "lang": "ko",
-        "images": [
-            {
-                "format": file_ext,
-                "name": f"doc.{file_ext}",
-                "data": base64_string
-            }
-        ],
-        "enableTableDetection": True
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "X-OCR-SECRET": secret_key
-    }
-
-    response = requests.post(url, headers=headers, data=json.dumps(payload))
-    response.raise_for_status()
-
-    result = response.json()
-    filename = "ocr_result.json"
-
-    save_json(filename, result)
-    print(f"✅ OCR 결과 저장 완료 → {filename}")
-    return filename
+    if ocr_cache is None:
+        return _request_clova_ocr(base64_string, file_ext)
+
+    try:
+        key = OcrResultCache.make_key(base64_string, file_ext)
+    except ValueError:
+        raise ValueError("base64 이미지 데이터를 디코딩할 수 없습니다.")
+    return ocr_cache.get_or_fetch(key, lambda: _request_clova_ocr(base64_string, file_ext))
+
+def _request_clova_ocr(base64_string: str, file_ext: str) -> dict:
+    result = get_ocr_client().recognize(base64_string, file_ext)
+    print("✅ OCR 요청 완료")
+    return result
+
+# --- 여러 페이지 OCR (한 번의 요청) ---
+# pages: [(base64, 확장자), ...] → 응답 images 배열이 페이지 순서대로 담긴 결과
+# 캐시 키는 페이지별 키를 순서대로 이어 해시 (한 페이지면 call_clova_ocr와 같은 키)
+MAX_PAGES = env_int("OCR_MAX_PAGES", 20)
+
+def request_pages(data: dict) -> list:
+    # 요청 본문 {"images": [{"image_base64": ..., "file_ext": ...}, ...]} → [(base64, 확장자), ...]
+    images = data.get("images")
+    if not isinstance(images, list) or not all(isinstance(image, dict) for image in images):
+        raise ValueError("images는 {image_base64, file_ext} 객체의 목록이어야 합니다.")
+    return [(image.get("image_base64"), (image.get("file_ext") or "jpg").lower()) for image in images]
+
+def call_clova_ocr_pages(pages: list) -> dict:
+    if not pages:
+        raise ValueError("이미지 데이터가 비어 있습니다.")
+    if len(pages) > MAX_PAGES:
+        raise ValueError(f"한 번에 보낼 수 있는 페이지는 최대 {MAX_PAGES}장입니다.")
+    for idx, (base64_string, file_ext) in enumerate(pages):
+        if not base64_string:
+            raise ValueError(f"{idx + 1}번째 페이지 이미지 데이터가 비어 있습니다.")
+        if file_ext.lower() not in SUPPORTED_EXTS:
+            raise ValueError(f"지원하지 않는 확장자입니다: {file_ext}")
+
+    if len(pages) == 1:
+        return call_clova_ocr(*pages[0])
+    if ocr_cache is None:
+        return _request_clova_ocr_pages(pages)
+
+    try:
+        page_keys = [OcrResultCache.make_key(base64_string, file_ext) for base64_string, file_ext in pages]
+    except ValueError:
+        raise ValueError("base64 이미지 데이터를 디코딩할 수 없습니다.")
+    key = hashlib.sha256("\0".join(page_keys).encode("ascii")).hexdigest()
+    return ocr_cache.get_or_fetch(key, lambda: _request_clova_ocr_pages(pages))
+
+def _request_clova_ocr_pages(pages: list) -> dict:
+    result = get_ocr_client().recognize_pages(pages)
+    received = len(result.get("images", []))
+    if received != len(pages):
+        raise RuntimeError(f"OCR 응답 페이지 수({received})가 요청 페이지 수({len(pages)})와 다릅니다.")
+    print(f"✅ OCR 요청 완료 ({len(pages)}페이지)")
+    return result
@@ -0,0 +1,204 @@
+import os
+import uuid
+import fcntl
+import types
+import argparse
+import contextlib
+import torch
+
+# --- ONNX Runtime 추론 백엔드 (CPU 전용) ---
+# PyTorch LayoutLM 모델을 model/<doctype>/onnx/ 아래에 ONNX로 내보내고
+# (선택) int8 동적 양자화 후 ONNX Runtime으로 실행
+# onnxruntime은 선택 의존성이므로 이 백엔드를 쓸 때만 import
+#
+# 내보내기/양자화는 배포 전에 오프라인으로 실행:
+#   python -m utils.onnx_backend resume certificate [--quantize]   (all이면 전체 문서 유형)
+# 요청 처리 중에는 파일을 읽기만 함 (LAYOUTLM_ONNX_AUTO_EXPORT=1이면 없거나 오래된 파일을 그 자리에서 내보냄)
+# 내보낼 때는 같은 디렉토리의 임시 파일에 쓴 뒤 os.replace로 바꿔치기하고, 파일 잠금으로 여러 워커가 동시에 내보내지 않게 함
+
+ONNX_DIR_NAME = "onnx"
+ONNX_FILENAME = "model.onnx"
+ONNX_INT8_FILENAME = "model.int8.onnx"
+LOCK_FILENAME = ".export.lock"
+INPUT_NAMES = ["input_ids", "bbox", "attention_mask", "token_type_ids"]
+
+def _import_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError:
+        raise ImportError("ONNX 백엔드를 사용하려면 onnxruntime을 설치해야 합니다: pip install -r requirements-onnx.txt")
+    return onnxruntime
+
+def onnx_model_path(model_path, quantize=False):
+    filename = ONNX_INT8_FILENAME if quantize else ONNX_FILENAME
+    return os.path.join(model_path, ONNX_DIR_NAME, filename)
+
+def _is_stale(target, *sources):
+    # 원본(가중치 또는 fp32 ONNX)이 대상 파일보다 새로우면 다시 내보냄
+    if not os.path.exists(target):
+        return True
+    target_mtime = os.path.getmtime(target)
+    return any(os.path.exists(source) and os.path.getmtime(source) > target_mtime for source in sources)
+
+def _weights_path(model_path):
+    return os.path.join(model_path, "model.safetensors")
+
+def is_stale(model_path, quantize=False):
+    fp32 = onnx_model_path(model_path)
+    if _is_stale(fp32, _weights_path(model_path)):
+        return True
+    return quantize and _is_stale(onnx_model_path(model_path, quantize=True), _weights_path(model_path), fp32)
+
+@contextlib.contextmanager
+def _export_lock(model_path):
+    # 같은 모델 디렉토리를 내보내는 프로세스/스레드는 한 번에 하나만
+    onnx_dir = os.path.join(model_path, ONNX_DIR_NAME)
+    os.makedirs(onnx_dir, exist_ok=True)
+    with open(os.path.join(onnx_dir, LOCK_FILENAME), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+@contextlib.contextmanager
+def _atomic_output(target):
+    # 같은 디렉토리의 임시 파일에 쓴 뒤 완성되면 바꿔치기 (읽는 쪽은 반쯤 쓴 파일을 볼 수 없음)
+    temp = f"{target}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    try:
+        yield temp
+        os.replace(temp, target)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+def export_onnx(model, model_path, opset=14):
+    output_path = onnx_model_path(model_path)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    # 배치/시퀀스 길이는 동적 축으로 내보내 버킷 패딩·배치 추론과 함께 사용
+    seq_len = 16
+    dummy = (
+        torch.ones(1, seq_len, dtype=torch.long),
+        torch.zeros(1, seq_len, 4, dtype=torch.long),
+        torch.ones(1, seq_len, dtype=torch.long),
+        torch.zeros(1, seq_len, dtype=torch.long),
+    )
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in INPUT_NAMES}
+    dynamic_axes["logits"] = {0: "batch", 1: "sequence"}
+
+    model.eval()
+    with torch.no_grad(), _atomic_output(output_path) as temp:
+        torch.onnx.export(
+            _LogitsOnly(model),
+            dummy,
+            temp,
+            input_names=INPUT_NAMES,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            dynamo=False,
+        )
+    print(f"✅ ONNX 내보내기 완료 → {output_path}")
+    return output_path
+
+def quantize_onnx(model_path):
+    _import_onnxruntime()
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    source = onnx_model_path(model_path)
+    target = onnx_model_path(model_path, quantize=True)
+    with _atomic_output(target) as temp:
+        quantize_dynamic(source, temp, weight_type=QuantType.QInt8)
+    print(f"✅ int8 동적 양자화 완료 → {target}")
+    return target
+
+def ensure_onnx_model(load_torch_model, model_path, quantize=False):
+    # 잠금을 잡은 뒤 다시 확인해서, 먼저 잠금을 잡은 쪽이 이미 내보냈으면 그대로 사용
+    if not is_stale(model_path, quantize):
+        return
+    with _export_lock(model_path):
+        if _is_stale(onnx_model_path(model_path), _weights_path(model_path)):
+            export_onnx(load_torch_model(), model_path)
+        if is_stale(model_path, quantize):
+            quantize_onnx(model_path)
+
+class _LogitsOnly(torch.nn.Module):
+    # HF 모델 출력(ModelOutput) 대신 logits 텐서만 반환하도록 감싸서 export
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, bbox, attention_mask, token_type_ids):
+        return self.model(
+            input_ids=input_ids,
+            bbox=bbox,
+            attention_mask=attention_mask,
+            token_type_ids=token_type_ids,
+        ).logits
+
+class OnnxTokenClassifier:
+    # PyTorch 모델과 같은 방식으로 model(**inputs).logits 형태로 호출 가능
+    def __init__(self, path, num_threads=None):
+        ort = _import_onnxruntime()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.path = path
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def __call__(self, **inputs):
+        feeds = {
+            name: value.to(torch.long).numpy()
+            for name, value in inputs.items()
+            if name in self._input_names
+        }
+        if "token_type_ids" in self._input_names and "token_type_ids" not in feeds:
+            feeds["token_type_ids"] = torch.zeros_like(inputs["input_ids"]).numpy()
+        logits = self.session.run(["logits"], feeds)[0]
+        return types.SimpleNamespace(logits=torch.from_numpy(logits))
+
+    def eval(self):
+        return self
+
+def load_onnx_model(load_torch_model, model_path, quantize=False, num_threads=None, auto_export=False):
+    if auto_export:
+        ensure_onnx_model(load_torch_model, model_path, quantize)
+    elif is_stale(model_path, quantize):
+        raise RuntimeError(
+            f"ONNX 모델 파일이 없거나 가중치보다 오래되었습니다: {onnx_model_path(model_path, quantize)} "
+            f"(python -m utils.onnx_backend {os.path.basename(model_path)}{' --quantize' if quantize else ''} 로 먼저 내보내세요)"
+        )
+    return OnnxTokenClassifier(onnx_model_path(model_path, quantize), num_threads=num_threads)
+
+def main():
+    from utils.common import DOC_TYPES
+    from utils.model_loader import MODEL_DIR, load_torch_model
+
+    parser = argparse.ArgumentParser(description="LayoutLM 모델을 ONNX로 내보내기 (배포 전 오프라인 실행)")
+    parser.add_argument("doctypes", nargs="+", help="문서 유형 목록 (all이면 전체)")
+    parser.add_argument("--quantize", action="store_true", help="int8 동적 양자화 파일도 만듦")
+    parser.add_argument("--force", action="store_true", help="최신 파일이 있어도 다시 내보냄")
+    parser.add_argument("--base-path", default=MODEL_DIR)
+    args = parser.parse_args()
+
+    doctypes = list(DOC_TYPES) if args.doctypes == ["all"] else args.doctypes
+    unknown = set(doctypes) - set(DOC_TYPES)
+    if unknown:
+        parser.error(f"알 수 없는 문서 유형입니다: {', '.join(sorted(unknown))}")
+
+    for doctype in doctypes:
+        model_path = os.path.join(args.base_path, doctype)
+        if args.force:
+            with _export_lock(model_path):
+                export_onnx(load_torch_model(model_path), model_path)
+                if args.quantize:
+                    quantize_onnx(model_path)
+        else:
+            ensure_onnx_model(lambda: load_torch_model(model_path), model_path, args.quantize)
+        print(f"✅ {doctype}: {onnx_model_path(model_path, args.quantize)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.common import save_debug_json
+from utils.config import DEBUG_ARTIFACTS, env_int
+from utils.table_tokens import run_table_token_extraction
+from utils.text_tokens import run_text_token_extraction
+from utils.merge_tokens import run_merge_tokens
+from utils.filter_tokens import run_filter_tokens
+from utils.layoutlm_inference import run_layoutlm_inference_pages, detect_pages_doc_type
+from utils.geometry import PageGeometry
+from utils.document_tokens import DocumentTokens
+
+# --- 단계 간 데이터를 파일 없이 메모리로 전달하는 파이프라인 ---
+# 디버그 모드(EYEON_DEBUG_ARTIFACTS=1)에서만 요청별 디렉토리에 중간 결과를 저장
+
+def new_run_id():
+    return uuid.uuid4().hex if DEBUG_ARTIFACTS else None
+
+def _dump(run_id, filename, data):
+    if run_id:
+        save_debug_json(run_id, filename, data)
+
+# --- 여러 페이지 처리 ---
+# OCR 응답의 images[i]를 한 페이지짜리 OCR 결과로 나눠 기존 단계(images[0] 기준)를 그대로 사용
+# 페이지별 추출/필터 단계는 스레드 풀에서 동시에 실행 (PIPELINE_PAGE_WORKERS, 1이면 순차)
+PAGE_WORKERS = env_int("PIPELINE_PAGE_WORKERS", 4)
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+def _get_page_pool():
+    global _page_pool
+    if _page_pool is None:
+        with _page_pool_lock:
+            if _page_pool is None:
+                _page_pool = ThreadPoolExecutor(max_workers=PAGE_WORKERS, thread_name_prefix="page")
+    return _page_pool
+
+def split_pages(ocr_data):
+    images = ocr_data.get('images') or []
+    if not images:
+        raise ValueError("OCR 결과에 페이지가 없습니다.")
+    return [dict(ocr_data, images=[image]) for image in images]
+
+def map_pages(fn, pages):
+    # fn(페이지 번호, 페이지) 결과를 페이지 순서대로 반환 (한 페이지라도 실패하면 그 예외를 그대로 전달)
+    if len(pages) == 1 or PAGE_WORKERS <= 1:
+        return [fn(idx, page) for idx, page in enumerate(pages)]
+    pool = _get_page_pool()
+    futures = [pool.submit(fn, idx, page) for idx, page in enumerate(pages)]
+    return [future.result() for future in futures]
+
+def page_run_id(run_id, idx, page_count):
+    # 디버그 저장 위치: 한 페이지면 요청 디렉토리, 여러 페이지면 그 아래 page<n>/
+    if not run_id or page_count == 1:
+        return run_id
+    return os.path.join(run_id, f"page{idx + 1}")
+
+def extract_tokens(ocr_data, run_id=None, geometry=None):
+    _dump(run_id, "ocr_result.json", ocr_data)
+
+    # 페이지 bbox 정규화/테이블 영역 계산은 한 번만 하고 모든 단계가 공유
+    geometry = geometry or PageGeometry.from_ocr(ocr_data)
+
+    # 1. 테이블 토큰 추출
+    table_tokens, table_bboxes = run_table_token_extraction(ocr_data, geometry)
+    _dump(run_id, "ocr_tokens_from_table.json", {"tokens": table_tokens, "bboxes": table_bboxes})
+
+    # 2. 텍스트 토큰 추출
+    text_tokens, text_bboxes = run_text_token_extraction(ocr_data, geometry)
+    _dump(run_id, "ocr_tokens_from_text.json", {"tokens": text_tokens, "bboxes": text_bboxes})
+
+    # 3. 병합
+    doc = run_merge_tokens(DocumentTokens(table_tokens, table_bboxes), DocumentTokens(text_tokens, text_bboxes))
+    _dump(run_id, "ocr_tokens.json", doc.to_dict())
+    return doc
+
+def run_create_pipeline(ocr_data):
+    return run_create_pages_pipeline(ocr_data)[0]
+
+def run_create_pages_pipeline(ocr_data):
+    run_id = new_run_id()
+    pages = split_pages(ocr_data)
+    run_ids = [page_run_id(run_id, idx, len(pages)) for idx in range(len(pages))]
+    docs = map_pages(lambda idx, page: extract_tokens(page, run_ids[idx]), pages)
+
+    # 4. LayoutLM 추론 (모든 페이지를 한 배치로)
+    results = run_layoutlm_inference_pages(docs)
+    for page_id, result in zip(run_ids, results):
+        _dump(page_id, "layoutlm_result.json", result)
+    return results
+
+def run_modify_pipeline(ocr_data):
+    return run_modify_pages_pipeline(ocr_data)[0]
+
+def run_modify_pages_pipeline(ocr_data):
+    run_id = new_run_id()
+    pages = split_pages(ocr_data)
+    run_ids = [page_run_id(run_id, idx, len(pages)) for idx in range(len(pages))]
+
+    def extract(idx, page):
+        geometry = PageGeometry.from_ocr(page)
+        return geometry, extract_tokens(page, run_ids[idx], geometry)
+    extracted = map_pages(extract, pages)
+    docs = [doc for _, doc in extracted]
+
+    # 제목은 보통 첫 페이지에만 있으므로 문서 유형은 전체 페이지에서 한 번만 감지
+    doctype = detect_pages_doc_type(docs)
+    if doctype is None:
+        raise ValueError("문서 유형을 감지할 수 없습니다.")
+
+    # 4. 수정용 필터링 처리
+    def filter_page(idx, page):
+        geometry, doc = extracted[idx]
+        filtered = run_filter_tokens(doc, page, geometry=geometry, doctype=doctype)
+        _dump(run_ids[idx], "ocr_tokens_filtered.json", filtered.to_dict())
+        return filtered
+    filtered_docs = map_pages(filter_page, pages)
+
+    # 5. LayoutLM 추론 (모든 페이지를 한 배치로)
+    results = run_layoutlm_inference_pages(filtered_docs, doctype)
+
+    page_results = []
+    for page_id, doc, result in zip(run_ids, docs, results):
+        _dump(page_id, "layoutlm_result.json", result)
+        page_results.append({
+            "layoutlm_result": result,
+            "merged_tokens": doc.to_dict()
+        })
+    return page_results
@@ -1,27 +1,89 @@
+import numpy as np
 import torch
+import torch.nn.functional as F
+from utils.config import env_list
 
-# 추론 과정 시 사용할 데이터 전처리
-def preprocess(tokens, bboxes, tokenizer):
+MAX_LENGTH = 512
+
+# 실제 시퀀스 길이를 아래 버킷 중 가장 가까운 큰 값으로 올려 패딩
+# (항상 512로 패딩하던 것을 줄이면서도 텐서 shape 종류는 몇 개로 유지)
+PAD_BUCKETS = tuple(sorted(int(b) for b in env_list("LAYOUTLM_PAD_BUCKETS", ["64", "128", "256", "384", "512"])))
+
+def pick_bucket(length, buckets=PAD_BUCKETS):
+    for bucket in buckets:
+        if length <= bucket:
+            return bucket
+    return max(length, buckets[-1])
+
+# 추론 과정 시 사용할 데이터 전처리 (doc: DocumentTokens)
+def preprocess(doc, tokenizer):
+    encoding, word_index, _ = preprocess_batch([doc], tokenizer)
+    word_ids = word_index[0]
+    valid_token_indices = np.flatnonzero((word_ids >= 0) & (word_ids < len(doc)))
+    return encoding, word_ids, valid_token_indices
+
+# 여러 문서를 한 번에 토크나이즈 (배치 추론용)
+# stride를 주면 512 토큰을 넘는 문서를 stride만큼 겹치는 512 길이 윈도우 여러 개로 나눔
+# sample_mapping[i]는 i번째 행(윈도우)이 속한 문서 인덱스
+# word_index[i, j]는 i번째 행 j번째 서브토큰의 단어 번호 (특수/패딩 토큰은 -1)
+def preprocess_batch(documents, tokenizer, stride=None, buckets=PAD_BUCKETS):
+    windowed = stride is not None
     encoding = tokenizer(
-        tokens,
+        [doc.tokens for doc in documents],
         is_split_into_words=True,
         return_offsets_mapping=True,
-        padding="max_length",
+        padding="longest",
         truncation=True,
-        max_length=512,
+        max_length=MAX_LENGTH,
+        stride=stride if windowed else 0,
+        return_overflowing_tokens=windowed,
         return_tensors="pt"
     )
 
-    word_ids = encoding.word_ids(batch_index=0)
-    bbox_padded = []
-    valid_token_indices = []
-    
-    for i, word_id in enumerate(word_ids):
-        if word_id is not None and word_id < len(bboxes):
-            bbox_padded.append(bboxes[word_id])
-            valid_token_indices.append(i)
-        else:
-            bbox_padded.append([0, 0, 0, 0])
-
-    encoding["bbox"] = torch.tensor([bbox_padded], dtype=torch.int32)
-    return encoding, word_ids, valid_token_indices
\ No newline at end of file
+    if windowed:
+        sample_mapping = encoding.pop("overflow_to_sample_mapping").numpy().astype(np.intp)
+    else:
+        sample_mapping = np.arange(len(documents), dtype=np.intp)
+
+    # 배치 내 가장 긴 길이 → 버킷 크기까지 오른쪽 패딩
+    seq_len = encoding["input_ids"].shape[1]
+    padded_len = pick_bucket(seq_len, buckets)
+    extra = padded_len - seq_len
+    if extra:
+        for key in list(encoding.keys()):
+            value = encoding[key]
+            pad_value = tokenizer.pad_token_id if key == "input_ids" else 0
+            pad_shape = (0, 0, 0, extra) if value.dim() == 3 else (0, extra)
+            encoding[key] = F.pad(value, pad_shape, value=pad_value)
+
+    word_index = word_index_array(encoding, padded_len)
+    encoding["bbox"] = torch.from_numpy(gather_bboxes(documents, word_index, sample_mapping))
+    return encoding, word_index, sample_mapping
+
+# --- 서브토큰 ↔ 단어 정렬 (인덱스 배열 연산) ---
+def word_index_array(encoding, padded_len):
+    rows = len(encoding["input_ids"])
+    word_index = np.full((rows, padded_len), -1, dtype=np.int64)
+    for row in range(rows):
+        word_ids = encoding.word_ids(batch_index=row)
+        word_index[row, :len(word_ids)] = [-1 if word_id is None else word_id for word_id in word_ids]
+    return word_index
+
+def gather_bboxes(documents, word_index, sample_mapping):
+    # 모든 문서의 bbox를 [0,0,0,0] 한 줄과 함께 이어 붙인 표에서 (행, 서브토큰)별 위치를 한 번에 gather
+    sizes = np.array([len(doc) for doc in documents], dtype=np.int64)
+    offsets = np.concatenate(([1], 1 + np.cumsum(sizes)[:-1])) if len(documents) else sizes
+    table = np.concatenate([np.zeros((1, 4), dtype=np.int32)] + [doc.bboxes for doc in documents])
+    rows = sample_mapping[:, None]
+    valid = (word_index >= 0) & (word_index < sizes[rows])
+    positions = np.where(valid, offsets[rows] + word_index, 0)
+    return table[positions]
+
+def first_subtoken_positions(word_index):
+    # 각 행에서 단어별 첫 서브토큰 위치 (행, 열) — 같은 행 안에서 단어 번호가 처음 나온 곳만 True
+    rows, cols = np.nonzero(word_index >= 0)
+    words = word_index[rows, cols]
+    first = np.ones(len(rows), dtype=bool)
+    # 행 우선 순서이므로 같은 행의 같은 단어는 바로 앞 위치와 비교하면 됨 (단어 번호는 행 안에서 단조 증가)
+    first[1:] = (rows[1:] != rows[:-1]) | (words[1:] != words[:-1])
+    return rows[first], cols[first]
@@ -1,6 +1,19 @@
+import os
 import cv2
+import time
 import base64
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from utils.config import env_str, env_int
+
+# 문서 윤곽 검출 방식
+# "coarse"(기본): 긴 변이 SCAN_DETECT_MAX_SIDE 안팎인 축소본에서 사각형을 찾고, 네 꼭짓점만 원본 해상도에서 cornerSubPix로 보정
+# "full": 패딩한 원본 전체에서 Canny → findContours (이전 방식)
+DETECT_MODE = env_str("SCAN_DETECT_MODE", "coarse")
+DETECT_MAX_SIDE = env_int("SCAN_DETECT_MAX_SIDE", 1000)
+OUTER_PADDING = 50
+WHITE = (255, 255, 255)
 
 # Step 1: Edge Detection
 def detect_edges(image):
@@ -23,6 +36,65 @@ def find_document_contour(edged_image):
 
     raise Exception("문서 윤곽선(사각형)을 찾을 수 없습니다.")
 
+# Step 2-1: 축소본에서 윤곽 검출 → 원본 좌표로 확대 → 꼭짓점 주변만 원본 해상도로 보정
+# 반환값은 패딩 전 원본 이미지 기준 꼭짓점 좌표 (문서가 사진 가장자리에 닿으면 음수/이미지 밖일 수 있음)
+def find_document_corners(image, mode=None, max_side=None):
+    mode = mode or DETECT_MODE
+    max_side = max_side or DETECT_MAX_SIDE
+    small = downscale_for_detection(image, max_side) if mode != "full" else image
+
+    if small is image:
+        padded = add_outer_padding(image, padding=OUTER_PADDING)
+        doc_cnt = find_document_contour(detect_edges(padded))
+        return doc_cnt.reshape(4, 2).astype(np.float32) - OUTER_PADDING
+
+    h, w = image.shape[:2]
+    scale = np.array([w / small.shape[1], h / small.shape[0]], dtype=np.float32)
+    small_padding = max(1, round(OUTER_PADDING / scale.max()))
+    try:
+        # 축소본에서는 문서 경계선이 한두 픽셀씩 끊기기 쉬워 3x3 팽창으로 이어 붙인 뒤 윤곽 검출
+        # (경계가 바깥쪽으로 1픽셀 남짓 밀리는 것은 꼭짓점 보정 단계에서 원본 해상도로 바로잡음)
+        edged = cv2.dilate(detect_edges(add_outer_padding(small, padding=small_padding)), np.ones((3, 3), np.uint8))
+        doc_cnt = find_document_contour(edged)
+    except Exception:
+        print("[경고] 축소본에서 문서 윤곽 검출 실패 → 원본 해상도로 다시 검출")
+        return find_document_corners(image, mode="full")
+
+    # 축소본 픽셀 중심 → 원본 픽셀 좌표
+    corners = (doc_cnt.reshape(4, 2).astype(np.float32) - small_padding + 0.5) * scale - 0.5
+    return refine_corners(image, corners, radius=int(np.ceil(4 * scale.max())) + 4)
+
+def downscale_for_detection(image, max_side):
+    # 긴 변이 max_side의 1.5배 이하가 될 때까지 정확히 절반씩 INTER_AREA 축소
+    # (2배 축소는 OpenCV 전용 경로라 임의 배율 INTER_AREA보다 훨씬 빠르고, 선형 보간과 달리 경계가 끊기지 않음)
+    small = image
+    while max(small.shape[:2]) > max_side * 1.5:
+        h, w = small.shape[:2]
+        small = cv2.resize(small, (w // 2, h // 2), interpolation=cv2.INTER_AREA)
+    return small
+
+def refine_corners(image, corners, radius):
+    # 꼭짓점마다 (2*radius+1) 크기 패치만 회색조로 바꿔 cornerSubPix 적용 (전체 이미지 변환 없음)
+    # 패치가 이미지 밖으로 나가거나 보정 결과가 패치를 벗어나면 확대한 좌표를 그대로 사용
+    h, w = image.shape[:2]
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.01)
+    win = max(3, radius // 2)
+    refined = corners.copy()
+    for i, (x, y) in enumerate(corners):
+        x0, y0 = int(round(x)) - radius, int(round(y)) - radius
+        x1, y1 = x0 + 2 * radius + 1, y0 + 2 * radius + 1
+        if x0 < 0 or y0 < 0 or x1 > w or y1 > h:
+            continue
+        patch = image[y0:y1, x0:x1]
+        if patch.ndim == 3:
+            patch = cv2.cvtColor(patch, cv2.COLOR_BGR2GRAY)
+        point = np.array([[[x - x0, y - y0]]], dtype=np.float32)
+        cv2.cornerSubPix(patch, point, (win, win), (-1, -1), criteria)
+        px, py = point[0, 0]
+        if abs(px + x0 - x) <= radius and abs(py + y0 - y) <= radius:
+            refined[i] = (px + x0, py + y0)
+    return refined
+
 # Step 3: Perspective Correction
 def order_points(pts):
     rect = np.zeros((4, 2), dtype="float32")
@@ -34,7 +106,8 @@ def order_points(pts):
     rect[3] = pts[np.argmax(diff)]  # bottom-left
     return rect
 
-def apply_perspective_transform(image, pts):
+def perspective_matrix(pts):
+    # 꼭짓점 → 펼친 문서 크기 (maxWidth, maxHeight)로 보내는 원근 변환 행렬
     rect = order_points(pts)
     (tl, tr, br, bl) = rect
 
@@ -53,23 +126,106 @@ def apply_perspective_transform(image, pts):
         [0, maxHeight - 1]
     ], dtype="float32")
 
-    M = cv2.getPerspectiveTransform(rect, dst)
-    warped = cv2.warpPerspective(image, M, (maxWidth, maxHeight), flags=cv2.INTER_LINEAR)
+    return cv2.getPerspectiveTransform(rect, dst), (maxWidth, maxHeight)
+
+def apply_perspective_transform(image, pts, skew=None):
+    # skew: (가로줄, 세로줄) deskew 각도(도), deskew_matrix를 원근 행렬에 합쳐 원본에서 한 번만 리샘플링
+    M, (maxWidth, maxHeight) = perspective_matrix(pts)
+    T = None
+    if skew is not None and any(skew):
+        T = deskew_matrix((maxWidth, maxHeight), skew)
+        M = T @ M
+    # 꼭짓점이 이미지 밖이면 흰 배경으로 채움 (원본을 흰색으로 패딩한 것과 같은 결과)
+    warped = cv2.warpPerspective(image, M, (maxWidth, maxHeight), flags=cv2.INTER_LINEAR,
+                                 borderMode=cv2.BORDER_CONSTANT, borderValue=WHITE)
+
+    if T is not None:
+        # 회전으로 모서리에 딸려 들어온 문서 바깥(책상 배경)은 흰색으로 지움 (이진화 시 테두리/얼룩 방지)
+        page = np.array([[0, 0], [maxWidth - 1, 0], [maxWidth - 1, maxHeight - 1], [0, maxHeight - 1]], dtype=np.float32)
+        page = cv2.transform(page[None], T[:2])[0]
+        outside = np.full((maxHeight, maxWidth), 255, dtype=np.uint8)
+        cv2.fillConvexPoly(outside, np.round(page).astype(np.int32), 0)
+        cv2.add(warped, WHITE, dst=warped, mask=outside)  # 포화 덧셈이라 바깥은 255
 
     return warped
 
 # Step 4: Image Enhancement (스캔 스타일 + 글자/테두리 강화)
-def enhance_image(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-    # ✅ 노이즈 제거 추가
-    gray = cv2.fastNlMeansDenoising(gray, None, h=15, templateWindowSize=7, searchWindowSize=21)
-
-
-    # CLAHE로 대비 향상
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(gray)
-
+# 품질 단계별 노이즈 제거 (나머지 CLAHE/샤프닝/이진화/팽창은 모든 단계 공통)
+# 시간 예산은 원근 보정된 약 1300x2100 문서(8MP 촬영본) 한 장의 노이즈 제거 단계 기준 (bench/bench_scan_quality.py)
+#   fast:     3x3 미디언 필터                                 (~1ms, 배경 얼룩이 남아 OCR 정확도는 가장 낮음)
+#   balanced: 절반 해상도에서 fastNlMeans (검색 창 15) 후 확대  (~0.7s 이내, 글자 픽셀 정확도는 best와 비슷)
+#   best:     원본 해상도 fastNlMeans (검색 창 21, 기존 동작)      (~4s, 문서 면적에 비례)
+SCAN_QUALITIES = ("fast", "balanced", "best")
+DEFAULT_QUALITY = env_str("SCAN_DEFAULT_QUALITY", "best")
+
+def check_quality(quality):
+    if quality not in SCAN_QUALITIES:
+        raise ValueError(f"지원하지 않는 스캔 품질입니다: {quality} (fast, balanced, best 중 선택)")
+    return quality
+
+def denoise(gray, quality="best"):
+    check_quality(quality)
+    if quality == "best":
+        return cv2.fastNlMeansDenoising(gray, None, h=15, templateWindowSize=7, searchWindowSize=21)
+    if quality == "balanced":
+        h, w = gray.shape[:2]
+        # 홀수 크기는 끝 줄을 복제해 짝수로 맞춤 (축소/확대 배율이 정확히 2배여야 띠 병렬 결과가 순차와 같음)
+        even = cv2.copyMakeBorder(gray, 0, h % 2, 0, w % 2, cv2.BORDER_REPLICATE)
+        small = cv2.resize(even, (even.shape[1] // 2, even.shape[0] // 2), interpolation=cv2.INTER_AREA)
+        # 2배 축소로 노이즈 표준편차가 절반 가까이 줄어드므로 필터 강도(h)도 낮춤
+        small = cv2.fastNlMeansDenoising(small, None, h=10, templateWindowSize=7, searchWindowSize=15)
+        return cv2.resize(small, (even.shape[1], even.shape[0]), interpolation=cv2.INTER_LINEAR)[:h, :w]
+    return cv2.medianBlur(gray, 3)
+
+# --- 가로 띠(strip) 병렬 보정 ---
+# 문서를 위아래로 겹치는 가로 띠로 나눠 스레드 풀에서 동시에 처리 (OpenCV 연산은 GIL을 놓으므로 코어 수만큼 빨라짐)
+# 각 띠는 위아래로 halo(px)만큼 더 잘라 처리한 뒤 가운데만 붙이므로, halo가 필터 반경 이상이면 순차 처리와 같은 결과
+# 띠 경계와 halo는 짝수로 맞춤 (balanced의 2배 축소/확대 격자가 전체 이미지와 같아지도록)
+# 기본은 순차 처리 (1), 이 프로세스가 쓸 수 있는 CPU 수(affinity)보다 많이 설정해도 그 수로 제한
+# os.cpu_count()는 컨테이너에서 호스트 코어 수를 돌려주므로 쓰지 않음, 코어가 하나면 띠 분할은 오버헤드만 늘림
+USABLE_CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+ENHANCE_WORKERS = max(1, min(env_int("SCAN_ENHANCE_WORKERS", 1), USABLE_CPUS))
+MIN_STRIP_ROWS = 128
+# 노이즈 제거 halo: 미디언 3x3 → 1, fastNlMeans 템플릿 7 + 검색 창 21 → 13, 절반 해상도 검색 창 15 + 축소/확대 → 2 * (3 + 7 + 1)
+DENOISE_HALO = {"fast": 2, "balanced": 24, "best": 16}
+# 샤프닝 3x3 (1) + adaptive threshold 블록 25 (12) + 팽창 2x2 (1)
+BINARIZE_HALO = 16
+_strip_pool = None
+_strip_pool_lock = threading.Lock()
+
+def _get_strip_pool():
+    global _strip_pool
+    if _strip_pool is None:
+        with _strip_pool_lock:
+            if _strip_pool is None:
+                _strip_pool = ThreadPoolExecutor(max_workers=ENHANCE_WORKERS, thread_name_prefix="scan-strip")
+    return _strip_pool
+
+def strip_bounds(height, count):
+    step = -(-height // count)
+    step += step % 2
+    return [(top, min(height, top + step)) for top in range(0, height, step)]
+
+def map_strips(fn, image, halo, workers=None):
+    # fn(띠 이미지) → 같은 크기의 결과, 띠별 결과를 원래 위치에 이어 붙여 반환
+    workers = ENHANCE_WORKERS if workers is None else workers
+    height = image.shape[0]
+    count = min(workers, height // MIN_STRIP_ROWS)
+    if count <= 1:
+        return fn(image)
+
+    out = np.empty_like(image)
+
+    def run(bounds):
+        top, bottom = bounds
+        lo, hi = max(0, top - halo), min(height, bottom + halo)
+        out[top:bottom] = fn(image[lo:hi])[top - lo:bottom - lo]
+
+    # 풀 크기(SCAN_ENHANCE_WORKERS)보다 적은 workers를 요청하면 띠 수만 줄어듦
+    list(_get_strip_pool().map(run, strip_bounds(height, count)))
+    return out
+
+def binarize(enhanced):
     # 강한 sharpening
     sharpen_kernel = np.array([[0, -1, 0],
                                [-1, 5, -1],
@@ -87,9 +243,23 @@ def enhance_image(image):
 
     # 미세한 팽창으로 테두리/글자 강화
     kernel = np.ones((2, 2), np.uint8)
-    final = cv2.dilate(binary, kernel, iterations=1)
+    return cv2.dilate(binary, kernel, iterations=1)
+
+def enhance_image(image, quality="best", workers=None):
+    # workers: 띠 병렬 처리 수 (None이면 SCAN_ENHANCE_WORKERS, 1이면 이미지 한 장 그대로 순차 처리)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
-    return final
+    # ✅ 노이즈 제거 추가 (품질 단계별, 띠 병렬)
+    check_quality(quality)
+    gray = map_strips(lambda strip: denoise(strip, quality), gray, DENOISE_HALO[quality], workers)
+
+
+    # CLAHE로 대비 향상 (타일 격자가 이미지 전체 기준이라 띠로 나누지 않고 한 번에 적용)
+    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+    enhanced = clahe.apply(gray)
+
+    # 샤프닝 → 이진화 → 팽창 (띠 병렬)
+    return map_strips(binarize, enhanced, BINARIZE_HALO, workers)
 
 # Step 5: 여백 추가
 def add_padding(image, padding=40, color=(255, 255, 255)):
@@ -108,21 +278,33 @@ def add_outer_padding(image, padding=40):
     return cv2.copyMakeBorder(image, padding, padding, padding, padding, cv2.BORDER_CONSTANT, value=color)
 
 # Step 6: Deskew 정확 보정 (Hough Transform 기반)
-def deskew_image(image):
-    import cv2
-    import numpy as np
-
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
-    edges = cv2.Canny(gray, 50, 150, apertureSize=3)
-
-    lines = cv2.HoughLines(edges, 1, np.pi / 180, 200)
+# SCAN_DESKEW_MODE
+#   "separate"(기본): 보정(이진화)까지 끝난 문서를 Hough 각도만큼 warpAffine으로 다시 회전 (기존 동작, 리샘플링 2번)
+#   "combined": 작은 펼친 문서에서 각도를 재서 원근 보정 행렬에 합치고 원본을 한 번만 리샘플링
+# 펼친 문서는 가로·세로 배율이 원본 종이와 다름 (꼭짓점 오차/원근으로 ±20%까지) → 종이에서 θ만큼 기운 내용이
+# 펼친 문서에서는 가로줄은 tan h = r·tanθ, 세로줄은 tan v = tanθ / r 만큼 기울어 보임 (r: 세로/가로 배율비)
+# 그래서 combined는 가로줄 각도 h와 세로줄 각도 v를 따로 재고, 종이 기준 회전(배율을 되돌려 회전한 뒤 다시 적용)과 같은
+# [[1, tan v], [-tan h, 1]]로 두 방향을 모두 바로 세움 (tanθ = √(tan h·tan v), r = √(tan h / tan v))
+DESKEW_MODE = env_str("SCAN_DESKEW_MODE", "separate")
+DESKEW_MAX_SIDE = env_int("SCAN_DESKEW_MAX_SIDE", 0)  # 0이면 펼친 문서 긴 변의 40% (320~640px)
+DESKEW_HOUGH_LINES = 20
+
+def estimate_skew_angle(gray, threshold=200, theta_step=np.pi / 180, max_lines=None, edges=None):
+    # 수평에 가까운 직선들의 기울기 중앙값(도), 보정할 수 없으면 None
+    # max_lines: 투표 수가 많은 직선 상위 N개만 사용 (HoughLines는 투표 수 내림차순으로 반환)
+    if edges is None:
+        edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+
+    # ✅ 수평 기준 ±15도 이내 직선만 투표 (범위 밖 직선은 어차피 버리므로 처음부터 제외)
+    lines = cv2.HoughLines(edges, 1, theta_step, threshold,
+                           min_theta=np.pi / 2 - np.pi / 12, max_theta=np.pi / 2 + np.pi / 12)
 
     if lines is None:
         print("[경고] Hough Line 없음. Deskew 생략")
-        return image
+        return None
 
     angles = []
-    for rho, theta in lines[:, 0]:
+    for rho, theta in lines[:max_lines, 0]:
         angle_deg = (theta * 180 / np.pi) - 90
 
         # ✅ 수평 기준 ±15도 이내 직선만 선택
@@ -131,36 +313,211 @@ def deskew_image(image):
 
     if not angles:
         print("[경고] 적절한 수평 라인 없음. Deskew 생략")
-        return image
+        return None
 
     median_angle = np.median(angles)
 
     if abs(median_angle) > 10:
         print(f"[경고] 회전 각도 {median_angle:.2f}도 -> Deskew 생략")
+        return None
+
+    # 0.01도 단위로 반올림 (float32 theta 오차로 생기는 -0.00도 회전 방지)
+    return round(float(median_angle), 2)
+
+def edge_points(edges, max_points=200000):
+    # 에지 점들의 (x, y) 좌표 (이미지 중심 기준), 많으면 고르게 max_points개만 사용
+    ys, xs = np.nonzero(edges)
+    if len(xs) > max_points:
+        keep = np.linspace(0, len(xs) - 1, max_points).astype(np.int64)
+        ys, xs = ys[keep], xs[keep]
+    h, w = edges.shape[:2]
+    return xs.astype(np.float32) - w // 2, ys.astype(np.float32) - h // 2
+
+def profile_skew_angle(xs, ys, angle, span=1.0, step=0.1, vertical=False):
+    # angle ± span 안에서 투영 프로파일로 각도를 다시 찾음: 후보 각도로 회전했을 때 에지 점들의 행 분포가
+    # 가장 뾰족한(행별 개수 제곱합이 가장 큰) 각도 선택 (글자 줄/표 선이 수평이 되면 몇 행에 몰림)
+    # vertical=True면 열 분포로 세로줄(표 세로선, 왼쪽 여백, 글자 세로획)이 수직이 되는 각도를 찾음
+    if len(xs) == 0:
+        return angle
+    candidates = angle + np.arange(-span, span + step / 2, step)
+    # 후보 전체를 한 번에: getRotationMatrix2D(center, candidate)로 회전한 뒤의 행(열) 좌표 (후보 수 x 점 수)
+    rad = np.deg2rad(candidates).astype(np.float32)[:, None]
+    if vertical:
+        coords = xs * np.cos(rad) + ys * np.sin(rad)
+    else:
+        coords = ys * np.cos(rad) - xs * np.sin(rad)
+    coords -= coords.min(axis=1, keepdims=True) - 0.5  # 0.5를 더해 내림 = 반올림
+    bins = coords.astype(np.int32)
+    width = int(bins.max()) + 1
+    bins += np.arange(len(candidates), dtype=np.int32)[:, None] * width
+    counts = np.bincount(bins.ravel(), minlength=len(candidates) * width).reshape(len(candidates), width)
+    scores = (counts.astype(np.float64) ** 2).sum(axis=1)
+    # 작은 이미지에서는 0.1도 차이가 1px 미만이라 여러 후보가 동점이 되므로 최댓값 0.5% 이내 후보들의 평균 사용
+    return round(float(candidates[scores >= scores.max() * 0.995].mean()), 2)
+
+def refine_skew_angle(edges, angle, span=1.0, step=0.1, max_points=200000, vertical=False):
+    xs, ys = edge_points(edges, max_points)
+    return profile_skew_angle(xs, ys, angle, span, step, vertical)
+
+def deskew_max_side(size):
+    # 각도 추정용 축소본의 긴 변: 펼친 문서 긴 변의 40% (320~640px)
+    # 2MP 촬영본(긴 변 ~800px)은 320px, 8MP(~1600px)는 640px → 작은 사진일수록 추정 비용도 작아짐
+    if DESKEW_MAX_SIDE > 0:
+        return DESKEW_MAX_SIDE
+    return int(np.clip(max(size) * 0.4, 320, 640))
+
+def deskew_matrix(size, skew):
+    # 펼친 문서 중심 기준으로 가로줄을 h도, 세로줄을 v도 바로 세우는 3x3 행렬
+    # (h == v면 getRotationMatrix2D 회전과 같고, 행렬식 1로 맞춰 문서 크기는 유지)
+    w, h = size
+    tan_h, tan_v = np.tan(np.deg2rad(skew))
+    L = np.array([[1.0, tan_v], [-tan_h, 1.0]]) / np.sqrt(abs(1 + tan_h * tan_v))
+    center = np.array([w // 2, h // 2], dtype=np.float64)
+    T = np.eye(3)
+    T[:2, :2] = L
+    T[:2, 2] = center - L @ center
+    return T
+
+def paper_skew_angle(skew):
+    # 종이 기준 기울기(도): 두 각도의 부호가 같으면 tanθ = √(tan h·tan v), 다르면(기울기 대신 밀림) 평균
+    tan_h, tan_v = np.tan(np.deg2rad(skew))
+    if tan_h * tan_v <= 0:
+        return round(float(np.mean(skew)), 2)
+    return round(float(np.sign(tan_h) * np.rad2deg(np.arctan(np.sqrt(tan_h * tan_v)))), 2)
+
+def estimate_page_skew(image, pts, max_side=None):
+    # 원근 행렬에 축소를 합쳐 작은 펼친 문서만 만든 뒤 (가로줄, 세로줄) 각도 추정, 보정할 수 없으면 (0.0, 0.0)
+    # 1) Hough(1도 구간, 투표 기준도 축소 비율만큼 낮춤)에서 투표 수 상위 직선들의 중앙값으로 대략적인 각도
+    #    (투표가 적은 짧은 직선까지 세면 0도 근처 직선이 많아 각도가 0 쪽으로 끌려감)
+    # 2) 그 주변 ±1도를 0.2도 → ±0.2도를 0.04도 간격 투영 프로파일로 정밀 보정 → 가로줄 각도 h
+    # 3) 세로줄 각도 v는 h 주변 ±max(1도, |h|)를 0.25도 → 0.05도 간격으로 찾음
+    # 가로줄 각도가 0.05도 미만이면 측정 간격(0.04도) 수준이라 보정하지 않음
+    M, (w, h) = perspective_matrix(pts)
+    scale = min(1.0, (max_side or deskew_max_side((w, h))) / max(w, h))
+    S = np.diag([scale, scale, 1.0])
+    small = cv2.warpPerspective(image, S @ M, (max(1, round(w * scale)), max(1, round(h * scale))),
+                                flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=WHITE)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+    angle = estimate_skew_angle(gray, threshold=max(50, int(200 * scale)), max_lines=DESKEW_HOUGH_LINES, edges=edges)
+    if angle is None:
+        return (0.0, 0.0)
+    xs, ys = edge_points(edges)
+    horizontal = profile_skew_angle(xs, ys, angle, span=1.0, step=0.2)
+    horizontal = profile_skew_angle(xs, ys, horizontal, span=0.2, step=0.04)
+    if abs(horizontal) < 0.05 or abs(horizontal) > 10:
+        return (0.0, 0.0)
+    # 펼친 문서 가장자리(종이 경계/책상)는 펼친 좌표계에서 정확히 수직이라 세로줄 각도를 0도로 끌어당기므로 가장자리 3%는 제외
+    margin = max(2, round(0.03 * max(edges.shape[:2])))
+    inner = (np.abs(xs) < edges.shape[1] / 2 - margin) & (np.abs(ys) < edges.shape[0] / 2 - margin)
+    xs, ys = xs[inner], ys[inner]
+    vertical = profile_skew_angle(xs, ys, horizontal, span=max(1.0, abs(horizontal)), step=0.25, vertical=True)
+    vertical = profile_skew_angle(xs, ys, vertical, span=0.25, step=0.05, vertical=True)
+    # 부호가 다르거나 tan h / tan v(= r²)가 0.5~2 밖이면 세로줄 추정이 틀린 것으로 보고 일반 회전(v = h)
+    if horizontal * vertical <= 0 or not 0.5 <= horizontal / vertical <= 2:
+        vertical = horizontal
+    return (horizontal, vertical)
+
+def deskew_image(image):
+    # 이미 펼친(보정까지 끝난) 이미지를 따로 회전 (SCAN_DESKEW_MODE=separate)
+    angle = estimate_skew_angle(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image)
+    if angle is None:
         return image
 
     (h, w) = image.shape[:2]
     center = (w // 2, h // 2)
-    M = cv2.getRotationMatrix2D(center, median_angle, 1.0)
+    M = cv2.getRotationMatrix2D(center, angle, 1.0)
     rotated = cv2.warpAffine(image, M, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
 
-    print(f"[✔️ Deskew 완료] {median_angle:.2f}도 회전 적용")
+    print(f"[✔️ Deskew 완료] {angle:.2f}도 회전 적용")
     return rotated
 
 
+# --- 결과 이미지 인코딩 ---
+# format: "json"(PNG를 base64로 JSON에 담음, 기존 동작) / "png" / "webp" (이미지 바이트를 그대로 응답)
+# bits: 8(회색조 8비트) / 1(흑백 1비트 PNG, 이진화된 문서는 손실 없이 더 작고 빠름)
+SCAN_FORMATS = {"json": "application/json", "png": "image/png", "webp": "image/webp"}
+PNG_COMPRESSION = env_int("SCAN_PNG_COMPRESSION", -1)  # 0~9, -1이면 OpenCV 기본값 (기존 동작)
+WEBP_QUALITY = env_int("SCAN_WEBP_QUALITY", 101)       # 100 초과면 무손실 (이진화 문서는 손실 압축 시 획이 번지고 오히려 커짐)
+
+def check_output(fmt, bits):
+    if fmt not in SCAN_FORMATS:
+        raise ValueError(f"지원하지 않는 스캔 결과 형식입니다: {fmt} (json, png, webp 중 선택)")
+    if bits not in (1, 8):
+        raise ValueError(f"지원하지 않는 비트 수입니다: {bits} (1 또는 8)")
+    if fmt == "webp" and bits == 1:
+        raise ValueError("1비트 출력은 png 또는 json 형식만 지원합니다.")
+    return fmt, bits
+
+def encode_page(page, fmt="png", bits=8):
+    if fmt == "webp":
+        ok, buffer = cv2.imencode('.webp', page, [cv2.IMWRITE_WEBP_QUALITY, WEBP_QUALITY])
+    else:
+        params = [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION] if PNG_COMPRESSION >= 0 else []
+        if bits == 1:
+            params += [cv2.IMWRITE_PNG_BILEVEL, 1]
+        ok, buffer = cv2.imencode('.png', page, params)
+    if not ok:
+        raise RuntimeError(f"스캔 결과를 {fmt} 형식으로 인코딩하지 못했습니다.")
+    return buffer.tobytes()
+
+class ScanEncodeStats:
+    # 응답 형식별 인코딩 횟수, 응답 본문 크기, 인코딩 시간 (json은 base64 변환 포함)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._formats = {}
+
+    def record(self, key, size, elapsed_ms):
+        with self._lock:
+            stats = self._formats.setdefault(key, {"count": 0, "bytes": 0, "encode_ms": 0.0})
+            stats["count"] += 1
+            stats["bytes"] += size
+            stats["encode_ms"] += elapsed_ms
+
+    def snapshot(self):
+        with self._lock:
+            formats = {key: dict(stats) for key, stats in self._formats.items()}
+        for stats in formats.values():
+            stats["avg_bytes"] = round(stats["bytes"] / stats["count"])
+            stats["avg_encode_ms"] = round(stats["encode_ms"] / stats["count"], 2)
+            stats["encode_ms"] = round(stats["encode_ms"], 2)
+        return formats
+
+scan_encode_stats = ScanEncodeStats()
+
+def get_scan_encode_stats():
+    return scan_encode_stats.snapshot()
+
+def encode_scan_result(page, fmt="json", bits=8):
+    # json이면 base64 문자열, png/webp면 이미지 바이트
+    start = time.perf_counter()
+    if fmt == "json":
+        body = base64.b64encode(encode_page(page, "png", bits)).decode('utf-8')
+    else:
+        body = encode_page(page, fmt, bits)
+    scan_encode_stats.record(fmt if bits == 8 else f"{fmt}-{bits}bit", len(body), (time.perf_counter() - start) * 1000)
+    return body
+
 # 전체 처리 흐름
-def scan_document(image):
+def scan_page(image, quality=None):
     if image is None:
         raise ValueError("이미지를 불러올 수 없습니다.")
-
-    image = add_outer_padding(image, padding=50)
-    edged = detect_edges(image)
-    doc_cnt = find_document_contour(edged)
-    warped = apply_perspective_transform(image, doc_cnt.reshape(4, 2))
-    final = enhance_image(warped)
-    deskewed = deskew_image(final)
-    padded = add_padding(deskewed, padding=40)
-
-    _, buffer = cv2.imencode('.png', padded)
-    encoded_string = base64.b64encode(buffer).decode('utf-8')
-    return encoded_string
\ No newline at end of file
+    quality = check_quality(quality or DEFAULT_QUALITY)
+
+    corners = find_document_corners(image)
+    if DESKEW_MODE == "combined":
+        # 원본 해상도에서는 원근 보정 + deskew를 합친 warpPerspective 한 번만 실행
+        skew = estimate_page_skew(image, corners)
+        warped = apply_perspective_transform(image, corners, skew)
+        if any(skew):
+            print(f"[✔️ Deskew 완료] {paper_skew_angle(skew):.2f}도 회전 적용 "
+                  f"(가로줄 {skew[0]:.2f}도, 세로줄 {skew[1]:.2f}도, 원근 보정과 함께)")
+        final = enhance_image(warped, quality)
+    else:
+        final = deskew_image(enhance_image(apply_perspective_transform(image, corners), quality))
+    return add_padding(final, padding=40)
+
+def scan_document(image, quality=None, fmt="json", bits=8):
+    # 기본값은 기존처럼 PNG base64 문자열 (fmt="png"/"webp"면 이미지 바이트)
+    fmt, bits = check_output(fmt, bits)
+    return encode_scan_result(scan_page(image, quality), fmt, bits)
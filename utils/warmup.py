@@ -0,0 +1,116 @@
+import gc
+import time
+import threading
+import torch
+from utils.common import DOC_TYPES
+from utils.config import env_list, env_bool
+from utils.model_loader import get_model_and_tokenizer, get_label_map
+from utils.preprocessing import preprocess_batch, PAD_BUCKETS
+from utils.document_tokens import DocumentTokens
+from utils.inference_executor import get_inference_executor
+
+# --- 시작 시 모델 미리 로드 + 워밍업 ---
+# 선택한 문서 유형의 모델/토크나이저/라벨 맵을 로드하고
+# 패딩 버킷별로 더미 forward pass를 한 번씩 돌려 메모리 할당기·커널 상태를 데움
+# 로드밸런서는 /api/ai/ready가 200일 때만 트래픽을 보내도록 설정
+# LAYOUTLM_EXECUTOR=process이면 추론을 맡는 워커 프로세스마다 로드·워밍업하고, 모두 끝나야 ready
+
+_state_lock = threading.Lock()
+_state = {
+    "status": "ready",   # pending → warming → ready / failed
+    "doctypes": {},      # doctype -> 워밍업 소요 시간(초), 실제로 로드된 문서 유형만
+    "skipped": [],       # EYEON_PRELOAD_DOCTYPES 중 알 수 없어 건너뛴 이름
+    "workers": None,     # 워밍업을 마친 추론 워커 프로세스 수 (process 실행기일 때만)
+    "error": None,
+}
+
+def get_warmup_state():
+    with _state_lock:
+        return {
+            "status": _state["status"],
+            "doctypes": dict(_state["doctypes"]),
+            "skipped": list(_state["skipped"]),
+            "workers": _state["workers"],
+            "error": _state["error"],
+        }
+
+def is_ready():
+    with _state_lock:
+        return _state["status"] == "ready"
+
+def _set_state(**kwargs):
+    with _state_lock:
+        _state.update(kwargs)
+
+# (미리 로드할 문서 유형, 알 수 없어 건너뛴 이름) — 설정 오타로 앱이 import 중에 죽지 않도록 경고만 남김
+def selected_doctypes():
+    names = env_list("EYEON_PRELOAD_DOCTYPES")
+    if names == ["all"]:
+        return list(DOC_TYPES), []
+    doctypes = [name for name in names if name in DOC_TYPES]
+    skipped = [name for name in names if name not in DOC_TYPES]
+    if skipped:
+        print(f"[경고] EYEON_PRELOAD_DOCTYPES에 알 수 없는 문서 유형이 있어 건너뜁니다: {', '.join(skipped)} "
+              f"(사용 가능: {', '.join(DOC_TYPES)})")
+    return doctypes, skipped
+
+def warmup_doctype(doctype):
+    (model, tokenizer), model_path = get_model_and_tokenizer(doctype)
+    get_label_map(model_path)
+
+    # 버킷마다 해당 길이로 패딩된 더미 입력으로 한 번씩 추론
+    doc = DocumentTokens(["[BLANK]"], [[0, 0, 10, 10]])
+    for bucket in PAD_BUCKETS:
+        encoding, _, _ = preprocess_batch([doc], tokenizer, buckets=(bucket,))
+        with torch.no_grad():
+            inputs = {k: v for k, v in encoding.items() if k != "offset_mapping"}
+            model(**inputs)
+
+# 이 프로세스에서 문서 유형별로 워밍업하고 소요 시간(초)을 반환 (추론 워커 프로세스에서도 실행)
+def warmup_doctypes(doctypes):
+    timings = {}
+    for doctype in doctypes:
+        started = time.perf_counter()
+        warmup_doctype(doctype)
+        timings[doctype] = round(time.perf_counter() - started, 3)
+    return timings
+
+def preload_models(doctypes):
+    _set_state(status="warming", doctypes={}, workers=None, error=None)
+    try:
+        executor = get_inference_executor()
+        if executor is not None and executor.mode == "process":
+            # 추론은 spawn된 워커 프로세스에서 돌므로 부모가 아니라 워커마다 로드 (소요 시간은 가장 느린 워커 기준)
+            worker_timings = executor.run_on_each_worker(warmup_doctypes, doctypes)
+            with _state_lock:
+                _state["doctypes"] = {doctype: max(timings[doctype] for timings in worker_timings) for doctype in doctypes}
+                _state["workers"] = len(worker_timings)
+            print(f"✅ 추론 워커 {len(worker_timings)}개 모델 워밍업 완료: {', '.join(doctypes)}")
+        else:
+            for doctype in doctypes:
+                elapsed = warmup_doctypes([doctype])[doctype]
+                with _state_lock:
+                    _state["doctypes"][doctype] = elapsed
+                print(f"✅ 모델 워밍업 완료: {doctype} ({elapsed}s)")
+    except Exception as e:
+        _set_state(status="failed", error=str(e))
+        print(f"[경고] 모델 워밍업 실패: {e}")
+        return
+    _set_state(status="ready")
+
+def start_preload():
+    doctypes, skipped = selected_doctypes()
+    _set_state(skipped=skipped)
+    if not doctypes:
+        return None
+    _set_state(status="pending")
+
+    if env_bool("EYEON_PRELOAD_BLOCKING", False):
+        preload_models(doctypes)
+        # gunicorn --preload 등으로 이 프로세스를 fork해 워커를 만들 때,
+        # 이미 로드된 객체를 GC 추적에서 빼서 워커의 GC가 공유 페이지를 건드려 복사되지 않게 함
+        gc.freeze()
+        return None
+    thread = threading.Thread(target=preload_models, args=(doctypes,), name="model-preload", daemon=True)
+    thread.start()
+    return thread